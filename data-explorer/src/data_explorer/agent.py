@@ -1,79 +1,279 @@
 """Data Explorer agent implementation using LangChain and LangGraph with MCP integration."""
 
+import asyncio
+import functools
+import hashlib
 import logging
+import re
+import secrets
+import time
 from typing import Dict, List, Any, AsyncGenerator, Optional
 from dotenv import load_dotenv
 import os
-from langchain_core.messages import HumanMessage, AIMessage, BaseMessage
+import aiosqlite
+import httpx
+from cachetools import LRUCache
+from langchain_core.messages import (
+    HumanMessage,
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    ToolMessage,
+)
 from langchain_openai import ChatOpenAI
-from langgraph.prebuilt import create_react_agent
+from langgraph.prebuilt import ToolNode, create_react_agent
 from langchain_mcp_adapters.client import MultiServerMCPClient
-from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langgraph.graph import StateGraph, MessagesState
+from langgraph.errors import GraphRecursionError
 
 # Configure logging
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
+# Environment configuration, read once at import
+_DOCKER_HOST_IP = os.getenv("DOCKER_HOST_IP")
+_MCP_URL = os.getenv("MCP_SERVER_URL", "http://localhost:8000/mcp")
+_OPENAI_BASE = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+_OPENAI_MODEL = os.getenv("OPENAI_MODEL", "/models/Qwen_Qwen3-8B-Q6_K_L.gguf")
+_COMPACT_DESCRIPTIONS = os.getenv("MCP_COMPACT_DESCRIPTIONS", "0") == "1"
 
+# Tool descriptions are sent with every LLM call; when compaction is enabled everything from
+# the first of these docstring sections on is dropped and the rest is capped in length.
+_DESCRIPTION_SECTION = re.compile(
+    r"^\s*(IMPORTANT|EXAMPLES?|INTERPRETING[A-Z ]*|NOTES?|Workflow|Typical workflow|Args|Returns)\s*:",
+    re.MULTILINE,
+)
+_MAX_DESCRIPTION_CHARS = 200
+
+
+@functools.lru_cache(maxsize=None)
 def get_host_url(url: str) -> str:
     """Convert localhost URLs to use host.docker.internal when running in Docker."""
-    if os.getenv("DOCKER_HOST_IP"):
-        return url.replace("localhost", os.getenv("DOCKER_HOST_IP"))
+    if _DOCKER_HOST_IP:
+        return url.replace("localhost", _DOCKER_HOST_IP)
     return url
 
 
-async def create_agent():
-    """Create a LangGraph agent with MCP tools and checkpoint memory."""
-    logger.info("Initializing MCP client...")
-    # Initialize MCP client
-    client = MultiServerMCPClient(
-        {
-            "elastic_appears": {
-                "url": get_host_url(os.getenv("MCP_SERVER_URL", "http://localhost:8000/mcp")),
-                "transport": "streamable_http",
-            }
-        }
-    )
+class _SharedTransport(httpx.AsyncHTTPTransport):
+    """Connection pool shared by all MCP sessions.
+
+    The MCP client opens (and closes) an HTTP client for every session/tool call; keeping
+    the transport open lets those clients reuse the same keep-alive connections.
+    """
+
+    async def aclose(self) -> None:
+        pass
+
 
-    # Get tools from MCP server
-    logger.info("Fetching tools from MCP server...")
-    tools = await client.get_tools()
-    logger.info(f"Retrieved {len(tools)} tools from MCP server")
-
-    logger.info("Initializing LLM...")
-    base_url = get_host_url(os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1"))
-    logger.info(f"OpenAI Base URL: {base_url}")
-    logger.info(f"OpenAI API Key: {os.getenv('OPENAI_API_KEY')}")
-    llm = ChatOpenAI(
-        base_url=base_url,
-        model=os.getenv("OPENAI_MODEL", "/models/Qwen_Qwen3-8B-Q6_K_L.gguf"),
-        temperature=0,
-        streaming=True,  # Enable streaming
-        max_tokens=4000,  # Limit response length to prevent infinite loops
-        timeout=120,  # Add timeout to prevent hanging
+_MCP_TRANSPORT = _SharedTransport(
+    http2=True, limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60)
+)
+
+
+def _mcp_http_client(
+    headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[httpx.Timeout] = None,
+    auth: Optional[httpx.Auth] = None,
+) -> httpx.AsyncClient:
+    """HTTP client factory for the MCP streamable HTTP transport using the shared pool."""
+    return httpx.AsyncClient(
+        transport=_MCP_TRANSPORT,
+        headers=headers,
+        timeout=timeout or httpx.Timeout(60),
+        auth=auth,
+        follow_redirects=True,
     )
-    logger.info("LLM initialized successfully")
 
-    # Create checkpointer for memory management
-    checkpointer = InMemorySaver()
 
-    # Create agent with tools and checkpoint memory
-    logger.info("Creating agent with tools and checkpoint memory...")
-    agent = create_react_agent(model=llm, tools=tools, checkpointer=checkpointer)
-    logger.info("Agent created successfully with checkpoint memory")
+def _compact(description: Optional[str]) -> Optional[str]:
+    """Shorten a tool description to its leading summary."""
+    if not description:
+        return description
+    match = _DESCRIPTION_SECTION.search(description)
+    if match:
+        description = description[: match.start()]
+    description = " ".join(description.split())
+    if len(description) > _MAX_DESCRIPTION_CHARS:
+        description = description[: _MAX_DESCRIPTION_CHARS - 3].rstrip() + "..."
+    return description
+
+
+async def _load_tools(client: MultiServerMCPClient) -> List[Any]:
+    """Fetch the MCP tools, compacting their descriptions if enabled.
+
+    Tools are sorted by name so the tool definitions at the start of every prompt are
+    byte-identical between calls and processes, which is what lets the LLM provider's
+    prompt cache match.
+    """
+    tools = sorted(await client.get_tools(), key=lambda t: t.name)
+    for tool in tools:
+        if _COMPACT_DESCRIPTIONS:
+            tool.description = _compact(tool.description)
+    return tools
+
+
+# Process-wide cache of the MCP client, its tools and the LLM. These are identical for
+# every agent/thread, so they are built once and shared.
+_MCP_CLIENT: Optional[MultiServerMCPClient] = None
+_MCP_TOOLS: Optional[List[Any]] = None
+_LLM: Optional[ChatOpenAI] = None
+_MCP_TOOLS_FETCHED_AT = 0.0
+_CACHE_LOCK = asyncio.Lock()
+_CACHE_STATS: Dict[str, Any] = {"hits": 0, "misses": 0, "init_time_ms": None}
+
+# Compiled agents keyed by (model, base_url, tool names). The tool list is re-fetched from
+# the (cached) MCP client once it is older than the TTL, so server-side tool changes are
+# picked up without paying the full client initialization again.
+_AGENT_CACHE: Dict[str, Any] = {}
+_AGENT_CACHE_TTL = float(os.getenv("AGENT_CACHE_TTL", "60"))
+_CHECKPOINTER: Optional[AsyncSqliteSaver] = None
+# SQLite database for conversation checkpoints; use a file path to persist across restarts
+_CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", ":memory:")
+
+
+def get_cache_stats() -> Dict[str, Any]:
+    """Return hit/miss counters and the initialization time of the shared MCP/LLM cache."""
+    return dict(_CACHE_STATS)
+
+
+async def _get_cached_components():
+    """Return the shared (tools, llm) pair, initializing them on first use."""
+    global _MCP_CLIENT, _MCP_TOOLS, _LLM, _MCP_TOOLS_FETCHED_AT
+
+    if _MCP_TOOLS is not None and time.monotonic() - _MCP_TOOLS_FETCHED_AT < _AGENT_CACHE_TTL:
+        _CACHE_STATS["hits"] += 1
+        return _MCP_TOOLS, _LLM
+
+    async with _CACHE_LOCK:
+        if _MCP_TOOLS is not None:
+            if time.monotonic() - _MCP_TOOLS_FETCHED_AT >= _AGENT_CACHE_TTL:
+                logger.info("Refreshing tool list from MCP server...")
+                _MCP_TOOLS = await _load_tools(_MCP_CLIENT)
+                _MCP_TOOLS_FETCHED_AT = time.monotonic()
+            _CACHE_STATS["hits"] += 1
+            return _MCP_TOOLS, _LLM
+
+        _CACHE_STATS["misses"] += 1
+        start = time.perf_counter()
+
+        logger.info("Initializing MCP client...")
+        client = MultiServerMCPClient(
+            {
+                "elastic_appears": {
+                    "url": get_host_url(_MCP_URL),
+                    "transport": "streamable_http",
+                    "httpx_client_factory": _mcp_http_client,
+                }
+            }
+        )
+
+        # Get tools from MCP server
+        logger.info("Fetching tools from MCP server...")
+        tools = await _load_tools(client)
+        logger.info(f"Retrieved {len(tools)} tools from MCP server")
+
+        logger.info("Initializing LLM...")
+        base_url = get_host_url(_OPENAI_BASE)
+        logger.info(f"OpenAI Base URL: {base_url}")
+        llm = ChatOpenAI(
+            base_url=base_url,
+            model=_OPENAI_MODEL,
+            temperature=0,
+            streaming=True,  # Enable streaming
+            max_tokens=4000,  # Limit response length to prevent infinite loops
+            timeout=120,  # Add timeout to prevent hanging
+        )
+        logger.info("LLM initialized successfully")
+
+        _MCP_CLIENT, _LLM = client, llm
+        # Assigned last: it is the sentinel checked outside the lock
+        _MCP_TOOLS = tools
+        _MCP_TOOLS_FETCHED_AT = time.monotonic()
+        _CACHE_STATS["init_time_ms"] = (time.perf_counter() - start) * 1000
+        return _MCP_TOOLS, _LLM
+
+
+# Tool calls allowed while answering a single user message before the run is aborted
+MAX_TOOL_CALLS_PER_TURN = 10
+# Each tool round costs three graph steps (hook, model, tools)
+RECURSION_LIMIT = 3 * MAX_TOOL_CALLS_PER_TURN + 5
+
+
+def _tool_call_guard(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Pre-model hook that stops the run when the current turn loops on tool calls."""
+    tool_calls = 0
+    for message in reversed(state["messages"]):
+        if isinstance(message, HumanMessage):
+            break
+        if isinstance(message, ToolMessage):
+            tool_calls += 1
+
+    if tool_calls > MAX_TOOL_CALLS_PER_TURN:
+        logger.warning(f"Too many tool calls ({tool_calls}), potential infinite loop detected")
+        raise GraphRecursionError(
+            f"Agent appears to be stuck in a loop after {tool_calls} tool calls. Please try rephrasing your query."
+        )
+    return {}
 
-    # Store checkpointer with agent for memory management
-    agent._checkpointer = checkpointer
 
-    return agent
+def _agent_cache_key(llm: ChatOpenAI, tools: List[Any]) -> str:
+    """Build the compiled-agent cache key from the model, endpoint and tool names."""
+    key = (llm.model_name, str(llm.openai_api_base), tuple(sorted(t.name for t in tools)))
+    return hashlib.blake2b(repr(key).encode()).hexdigest()
+
+
+async def create_agent():
+    """Create a LangGraph agent with MCP tools and checkpoint memory."""
+    global _CHECKPOINTER
+
+    tools, llm = await _get_cached_components()
+    key = _agent_cache_key(llm, tools)
+
+    async with _CACHE_LOCK:
+        agent = _AGENT_CACHE.get(key)
+        if agent is not None:
+            logger.info("Reusing cached agent")
+            return agent
+
+        # Create checkpointer for memory management, shared by every cached agent so
+        # conversation history survives a tool-list refresh
+        if _CHECKPOINTER is None:
+            # SQLite checkpoints store each step incrementally instead of re-serializing the
+            # whole thread state on every write
+            conn = await aiosqlite.connect(_CHECKPOINT_DB)
+            _CHECKPOINTER = AsyncSqliteSaver(conn)
+
+        # Create agent with tools and checkpoint memory
+        logger.info("Creating agent with tools and checkpoint memory...")
+        # ToolNode runs all tool calls of one model turn concurrently; with error handling
+        # on, a failing call is reported back to the model instead of aborting its siblings
+        agent = create_react_agent(
+            model=llm,
+            tools=ToolNode(tools, handle_tool_errors=True),
+            checkpointer=_CHECKPOINTER,
+            pre_model_hook=_tool_call_guard,
+        )
+        logger.info("Agent created successfully with checkpoint memory")
+
+        # Store checkpointer with agent for memory management
+        agent._checkpointer = _CHECKPOINTER
+
+        # Only the agent for the current tool set is worth keeping
+        _AGENT_CACHE.clear()
+        _AGENT_CACHE[key] = agent
+        return agent
 
 
 async def run_agent(
     query: str, agent: Optional[Any] = None, thread_id: Optional[str] = None
 ) -> AsyncGenerator[Dict[str, Any], None]:
-    """Run the data explorer agent with streaming responses and checkpoint memory."""
+    """Run the data explorer agent with streaming responses and checkpoint memory.
+
+    Yields ``{"message": ..., "metadata": ...}`` for every streamed message chunk, or
+    ``{"error": ...}`` if the run fails.
+    """
     logger.info(f"Running agent with query: {query}")
 
     try:
@@ -86,62 +286,29 @@ async def run_agent(
 
         # Generate thread ID if none provided
         if thread_id is None:
-            import uuid
-
-            thread_id = str(uuid.uuid4())
+            thread_id = secrets.token_hex(8)
             logger.info(f"Generated thread ID: {thread_id}")
 
-        # Get current messages for context
-        messages = get_messages(agent, thread_id)
-        logger.info(
-            f"Running agent with {len(messages)} messages in history for thread: {thread_id}"
-        )
-
-        # Prepare input with new message
-        input_messages = messages + [HumanMessage(content=query)]
+        # Only the new message is sent: the checkpointer restores the thread's history
+        # inside the graph, so prepending it here would duplicate it in the prompt
+        logger.info(f"Running agent for thread: {thread_id}")
+        input_messages = [HumanMessage(content=query)]
+        await get_messages(agent, thread_id)
+        record_message(thread_id, input_messages[0])
 
         # Run the agent with streaming and checkpoint memory
         config = {
             "configurable": {"thread_id": thread_id},
-            "recursion_limit": 50,  # Increase recursion limit to handle complex workflows
+            "recursion_limit": RECURSION_LIMIT,
         }
 
-        step_count = 0
-        consecutive_tool_calls = 0
-        max_consecutive_tool_calls = 10  # Prevent infinite tool calling loops
-
-        async for chunk in agent.astream(
-            {"messages": input_messages}, config, stream_mode="values"
+        # "messages" mode yields (message_chunk, metadata) pairs token by token instead of
+        # the whole accumulated state once per graph step
+        async for message, metadata in agent.astream(
+            {"messages": input_messages}, config, stream_mode="messages"
         ):
-            step_count += 1
-            logger.debug(f"Step {step_count}: Received chunk type: {type(chunk)}")
-
-            # Log tool calls to help debug recursion issues
-            if isinstance(chunk, dict) and "tools" in chunk:
-                consecutive_tool_calls += 1
-                logger.info(
-                    f"Step {step_count}: Tool call detected (consecutive: {consecutive_tool_calls})"
-                )
-
-                # Check for potential infinite loop
-                if consecutive_tool_calls > max_consecutive_tool_calls:
-                    logger.warning(
-                        f"Step {step_count}: Too many consecutive tool calls ({consecutive_tool_calls}), potential infinite loop detected"
-                    )
-                    yield {
-                        "error": f"Agent appears to be stuck in a loop after {consecutive_tool_calls} consecutive tool calls. Please try rephrasing your query."
-                    }
-                    return
-
-                if "messages" in chunk["tools"]:
-                    for msg in chunk["tools"]["messages"]:
-                        if hasattr(msg, "tool_call_id") and msg.tool_call_id:
-                            logger.info(f"Step {step_count}: Tool call ID: {msg.tool_call_id}")
-            else:
-                # Reset consecutive tool call counter when we get a non-tool response
-                consecutive_tool_calls = 0
-
-            yield chunk
+            record_message(thread_id, message)
+            yield {"message": message, "metadata": metadata}
 
         logger.info("Agent completed successfully")
 
@@ -151,18 +318,25 @@ async def run_agent(
 
 
 # Memory management functions
-def get_messages(agent: Any, thread_id: str) -> List[BaseMessage]:
-    """Get all messages in the conversation history for the given thread."""
+
+# Shadow copy of each thread's messages, kept up to date while responses stream so that
+# history reads do not have to deserialize the checkpoint on every call. Only the most
+# recently used threads are kept; an evicted thread is reloaded from the checkpointer.
+_MSG_CACHE: LRUCache = LRUCache(maxsize=int(os.getenv("AGENT_MSG_CACHE_THREADS", "256")))
+
+
+async def _fallback_from_checkpointer(agent: Any, thread_id: str) -> List[BaseMessage]:
+    """Read the thread's messages from the agent's checkpointer."""
     try:
         checkpointer = agent._checkpointer
-        checkpoint = checkpointer.get({"configurable": {"thread_id": thread_id}})
+        checkpoint = await checkpointer.aget({"configurable": {"thread_id": thread_id}})
 
         if (
             checkpoint
             and "channel_values" in checkpoint
             and "messages" in checkpoint["channel_values"]
         ):
-            return checkpoint["channel_values"]["messages"]
+            return list(checkpoint["channel_values"]["messages"])
 
         logger.debug(f"No messages found in checkpoint for thread {thread_id}")
     except Exception as e:
@@ -171,37 +345,70 @@ def get_messages(agent: Any, thread_id: str) -> List[BaseMessage]:
     return []
 
 
-def clear_history(agent: Any, thread_id: str):
+async def get_messages(agent: Any, thread_id: str) -> List[BaseMessage]:
+    """Get all messages in the conversation history for the given thread."""
+    messages = _MSG_CACHE.get(thread_id)
+    if messages is None:
+        messages = await _fallback_from_checkpointer(agent, thread_id)
+        _MSG_CACHE[thread_id] = messages
+    return messages
+
+
+def record_message(thread_id: str, message: BaseMessage):
+    """Add a new or streamed message to the thread's cached history.
+
+    The cache must have been loaded with ``get_messages`` first. If the thread has been
+    evicted since, the message is skipped rather than starting a partial history; the next
+    ``get_messages`` reloads it in full from the checkpointer.
+    """
+    messages = _MSG_CACHE.get(thread_id)
+    if messages is None:
+        return
+    last = messages[-1] if messages else None
+    if (
+        isinstance(message, AIMessageChunk)
+        and isinstance(last, AIMessageChunk)
+        and last.id == message.id
+    ):
+        # Streamed tokens of the same response are merged into a single message
+        messages[-1] = last + message
+    else:
+        messages.append(message)
+
+
+async def clear_history(agent: Any, thread_id: str):
     """Clear the conversation history for the given thread."""
     try:
         checkpointer = agent._checkpointer
-        checkpointer.delete_thread(thread_id)
+        await checkpointer.adelete_thread(thread_id)
+        _MSG_CACHE.pop(thread_id, None)
         logger.info(f"Cleared conversation history for thread: {thread_id}")
     except Exception as e:
         logger.warning(f"Could not clear history for thread {thread_id}: {e}")
 
 
-def get_history_summary(agent: Any, thread_id: str) -> str:
+async def get_history_summary(agent: Any, thread_id: str) -> str:
     """Get a summary of the conversation history for the given thread."""
-    messages = get_messages(agent, thread_id)
+    messages = await get_messages(agent, thread_id)
     if not messages:
         return "No conversation history."
 
-    summary = f"Conversation has {len(messages)} messages:\n"
+    parts = [f"Conversation has {len(messages)} messages:\n"]
     for i, msg in enumerate(messages[-5:], 1):  # Show last 5 messages
         role = "User" if isinstance(msg, HumanMessage) else "Assistant"
         content_preview = msg.content[:100] + "..." if len(msg.content) > 100 else msg.content
-        summary += f"{i}. {role}: {content_preview}\n"
+        parts.append(f"{i}. {role}: {content_preview}\n")
 
-    return summary
+    return "".join(parts)
 
 
-def get_thread_checkpoints(agent: Any, thread_id: str) -> List[Dict[str, Any]]:
+async def get_thread_checkpoints(agent: Any, thread_id: str) -> List[Dict[str, Any]]:
     """Get all checkpoints for the given thread."""
     try:
         checkpointer = agent._checkpointer
-        # Use the correct list() method from InMemorySaver
-        checkpoints = list(checkpointer.list({"configurable": {"thread_id": thread_id}}))
+        checkpoints = [
+            cp async for cp in checkpointer.alist({"configurable": {"thread_id": thread_id}})
+        ]
 
         result = []
         for cp in checkpoints:
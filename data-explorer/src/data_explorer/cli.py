@@ -1,11 +1,39 @@
 """Command-line interface for the Data Explorer."""
 
 import asyncio
+import sys
 import click
-from dotenv import load_dotenv
-from .agent import run_agent
 
-load_dotenv()
+# The agent module pulls in LangChain/LangGraph, so it is only imported once a command
+# actually runs; --help and shell completion stay fast.
+
+
+async def _consume(query: str, agent=None):
+    """Echo the agent's response to a query as it streams in."""
+    from .agent import run_agent
+
+    async for chunk in run_agent(query, agent=agent):
+        if "error" in chunk:
+            click.echo(f"\nError: {chunk['error']}", err=True)
+            continue
+        message = chunk["message"]
+        if chunk["metadata"].get("langgraph_node") == "tools":
+            click.echo(f"\n[used tool {message.name}]")
+        elif isinstance(message.content, str) and message.content:
+            click.echo(message.content, nl=False)
+    click.echo()
+
+
+async def _run_queries(queries):
+    """Run queries one after another against a single agent."""
+    from .agent import create_agent
+
+    agent = await create_agent()
+    for query in queries:
+        query = query.strip()
+        if not query:
+            continue
+        await _consume(query, agent=agent)
 
 
 @click.group()
@@ -18,10 +46,18 @@ def cli():
 @click.argument("query")
 def explore(query: str):
     """Run a data exploration query."""
-    result = asyncio.run(run_agent(query))
-    click.echo(result)
+    asyncio.run(_consume(query))
+
+
+@cli.command()
+def batch():
+    """Run one data exploration query per line of stdin, reusing a single agent."""
+    asyncio.run(_run_queries(sys.stdin))
 
 
 def main():
     """Entry point for the CLI."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
     cli()
@@ -1,19 +1,26 @@
-import json
 import logging
 import os
 from typing import Any, Dict, List, Optional, Generator, AsyncGenerator, Tuple
 import asyncio
+import weakref
 import gradio as gr
+import orjson
+import uvicorn
+from fastapi import FastAPI
 from gradio import ChatMessage
 from dotenv import load_dotenv
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.errors import GraphRecursionError
 
 from .agent import (
+    RECURSION_LIMIT,
     create_agent,
     run_agent,
     get_history_summary,
     clear_history,
     get_messages,
     get_thread_checkpoints,
+    record_message,
 )
 
 # Load environment variables
@@ -24,53 +31,102 @@ logger = logging.getLogger(__name__)
 
 # Global agent
 agent: Optional[Any] = None
-# Default thread ID for web interface
+_agent_lock = asyncio.Lock()
+# Thread ID prefix for the web interface; each browser session gets its own thread
 DEFAULT_THREAD_ID = "web_interface"
+# Chat entries kept in the UI; the full history lives in the agent's checkpointer, so
+# older entries are dropped to bound the payload re-sent to the browser on every update
+MAX_DISPLAY_MESSAGES = int(os.getenv("WEB_MAX_DISPLAY_MESSAGES", "200"))
+# Minimum seconds between streamed UI updates (~30 updates/s)
+STREAM_FLUSH_INTERVAL = float(os.getenv("WEB_STREAM_FLUSH_INTERVAL", "0.03"))
+# Queries streamed concurrently per worker, and how many more may wait in Gradio's queue.
+# Only queries of different sessions overlap; each conversation thread runs one at a time.
+QUEUE_CONCURRENCY_LIMIT = int(os.getenv("WEB_CONCURRENCY_LIMIT", "16"))
+QUEUE_MAX_SIZE = int(os.getenv("WEB_QUEUE_SIZE", "64"))
+# One lock per conversation thread with a query running or waiting; dropped once unused
+_thread_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+def _thread_id(request: Optional[gr.Request]) -> str:
+    """Checkpoint thread of the browser session that made the request."""
+    session_hash = getattr(request, "session_hash", None)
+    return f"{DEFAULT_THREAD_ID}:{session_hash}" if session_hash else DEFAULT_THREAD_ID
 
 
 def _is_tool_message(message) -> bool:
     """Check if a message is a tool message that should be filtered out."""
-    # Check if it's a tool message by role or type
-    if hasattr(message, "type") and message.type == "tool":
-        return True
-    if hasattr(message, "role") and message.role == "tool":
-        return True
-    if hasattr(message, "tool_call_id"):
-        return True
-    return False
+    return isinstance(message, ToolMessage)
 
 
 def _is_assistant_message(message) -> bool:
     """Check if a message is an assistant message that should be included."""
-    # Check if it's an assistant message by role or type
-    if hasattr(message, "type") and message.type == "ai":
-        return True
-    if hasattr(message, "role") and message.role == "assistant":
-        return True
-    if hasattr(message, "type") and message.type == "assistant":
-        return True
-    # If no role/type is specified, assume it's an assistant message (for backward compatibility)
-    if not hasattr(message, "role") and not hasattr(message, "type"):
-        return True
-    return False
+    # Anything that is neither a tool nor a user message is treated as assistant output
+    # (for backward compatibility); AIMessageChunk is a subclass of AIMessage
+    return isinstance(message, AIMessage) or not isinstance(message, (ToolMessage, HumanMessage))
+
+
+def _tool_chat_message(message) -> ChatMessage:
+    """Build the collapsed chat entry summarizing a tool result."""
+    tool_name = message.name
+    tool_content = message.content
+    # Try to parse JSON content for better display
+    try:
+        tool_data = orjson.loads(tool_content)
+        if isinstance(tool_data, dict):
+            # Show a summary of the tool result
+            if "status" in tool_data:
+                summary = f"Tool {tool_name} completed with status: {tool_data['status']}"
+                if "jobs" in tool_data:
+                    summary += f" (found {len(tool_data['jobs'])} jobs)"
+                elif "total_jobs" in tool_data:
+                    summary += f" (total: {tool_data['total_jobs']} jobs)"
+            else:
+                summary = f"Tool {tool_name} returned data"
+        else:
+            summary = f"Tool {tool_name} returned: {str(tool_data)[:100]}..."
+    except orjson.JSONDecodeError:
+        # If not JSON, show raw content
+        summary = f"Tool {tool_name}: {tool_content[:100]}..."
+
+    return ChatMessage(
+        role="assistant",
+        content=summary,
+        metadata={"title": f"🛠️ Used tool {tool_name}"},
+    )
 
 
 async def explore_data(
-    query: str, history: Optional[List[ChatMessage]] = None
+    query: str, history: Optional[List[ChatMessage]] = None, request: gr.Request = None
 ) -> AsyncGenerator[Tuple[str, List[ChatMessage]], None]:
     """Run a data exploration query and stream the results with checkpoint memory using ChatMessage."""
+    thread_id = _thread_id(request)
+    # Queries of different sessions run concurrently, but two on the same thread (a double
+    # submit, or callers without a session) would interleave their messages, so they queue
+    lock = _thread_locks.setdefault(thread_id, asyncio.Lock())
+    async with lock:
+        async for update in _explore_thread(query, history, thread_id):
+            yield update
+
+
+async def _explore_thread(
+    query: str, history: Optional[List[ChatMessage]], thread_id: str
+) -> AsyncGenerator[Tuple[str, List[ChatMessage]], None]:
     global agent
 
     try:
         logger.info(f"Processing query: {query}")
 
-        # Initialize agent if not already done
+        # Initialize agent if not already done; concurrent first queries create it only once
         if agent is None:
-            logger.info("Initializing agent with checkpoint memory...")
-            agent = await create_agent()
+            async with _agent_lock:
+                if agent is None:
+                    logger.info("Initializing agent with checkpoint memory...")
+                    agent = await create_agent()
 
         # Convert history to list of ChatMessage objects
         messages = history or []
+        if len(messages) > MAX_DISPLAY_MESSAGES:
+            del messages[:-MAX_DISPLAY_MESSAGES]
         logger.info(f"Starting with {len(messages)} existing messages")
 
         # Add user message immediately
@@ -80,128 +136,73 @@ async def explore_data(
         # Stream directly from the agent like the LangChain example
         logger.info("Invoking agent with query...")
 
-        # Get current messages for context
-        from .agent import get_messages
-
-        current_messages = get_messages(agent, DEFAULT_THREAD_ID)
-        logger.info(f"Running agent with {len(current_messages)} messages in history")
-
-        # Prepare input with new message
-        from langchain_core.messages import HumanMessage
-
-        input_messages = current_messages + [HumanMessage(content=query)]
+        # Prepare input with new message; the checkpointer restores the thread's history
+        input_messages = [HumanMessage(content=query)]
+        await get_messages(agent, thread_id)
+        record_message(thread_id, input_messages[0])
 
         # Run the agent with streaming and checkpoint memory
-        config = {"configurable": {"thread_id": DEFAULT_THREAD_ID}, "recursion_limit": 50}
-
-        step_count = 0
-        consecutive_tool_calls = 0
-        max_consecutive_tool_calls = 10
-
-        async for chunk in agent.astream(
-            {"messages": input_messages},
-            config,
-            # stream_mode="values"
+        config = {
+            "configurable": {"thread_id": thread_id},
+            "recursion_limit": RECURSION_LIMIT,
+        }
+
+        # Assistant message currently receiving streamed tokens. It is mutated in place so
+        # earlier entries stay unchanged and only the last message differs between updates.
+        current_response: Optional[ChatMessage] = None
+        # Tokens of current_response; joined only when an update is pushed to the browser
+        parts: List[str] = []
+        # Tokens are coalesced and pushed to the browser at most every STREAM_FLUSH_INTERVAL
+        loop = asyncio.get_running_loop()
+        last_flush = loop.time()
+        pending = False
+
+        # "messages" mode yields (message_chunk, metadata) pairs token by token
+        async for message, metadata in agent.astream(
+            {"messages": input_messages}, config, stream_mode="messages"
         ):
-            step_count += 1
-            logger.info(f"Step {step_count}: Received chunk type: {type(chunk)}")
-            logger.info(f"Step {step_count}: Chunk: {chunk}")
-            if isinstance(chunk, dict):
-                logger.info(f"Step {step_count}: Chunk keys: {list(chunk.keys())}")
-                if "messages" in chunk:
-                    logger.info(f"Step {step_count}: Messages count: {len(chunk['messages'])}")
-                if "output" in chunk:
-                    logger.info(f"Step {step_count}: Output: {chunk['output'][:100]}...")
-
-            # Handle tool usage - LangGraph format
-            if isinstance(chunk, dict) and "tools" in chunk:
-                consecutive_tool_calls += 1
-                logger.info(
-                    f"Step {step_count}: Tool call detected (consecutive: {consecutive_tool_calls})"
-                )
-
-                # Check for potential infinite loop
-                if consecutive_tool_calls > max_consecutive_tool_calls:
-                    logger.warning(
-                        f"Step {step_count}: Too many consecutive tool calls ({consecutive_tool_calls}), potential infinite loop detected"
-                    )
-                    messages.append(
-                        ChatMessage(
-                            role="assistant",
-                            content=f"Agent appears to be stuck in a loop after {consecutive_tool_calls} consecutive tool calls. Please try rephrasing your query.",
-                            metadata={"title": "❌ Loop Detected", "status": "done"},
-                        )
-                    )
+            record_message(thread_id, message)
+
+            # Single dispatch per streamed message: tool results first, then assistant tokens
+            if _is_tool_message(message):
+                if current_response is not None:
+                    current_response.content = "".join(parts)
+                    current_response = None
+                messages.append(_tool_chat_message(message))
+                pending = False
+                last_flush = loop.time()
+                yield "", messages
+
+            # Handle assistant tokens - append each delta to the current response
+            elif message.content and _is_assistant_message(message):
+                if current_response is None:
+                    current_response = ChatMessage(role="assistant", content="")
+                    messages.append(current_response)
+                    parts = []
+                parts.append(message.content)
+                pending = True
+                if loop.time() - last_flush >= STREAM_FLUSH_INTERVAL:
+                    current_response.content = "".join(parts)
+                    pending = False
+                    last_flush = loop.time()
                     yield "", messages
-                    return
-
-                # Process tool messages in LangGraph format
-                if "messages" in chunk["tools"]:
-                    for msg in chunk["tools"]["messages"]:
-                        if hasattr(msg, "name") and hasattr(msg, "content"):
-                            tool_name = msg.name
-                            tool_content = msg.content
-                            # Try to parse JSON content for better display
-                            try:
-                                tool_data = json.loads(tool_content)
-                                if isinstance(tool_data, dict):
-                                    # Show a summary of the tool result
-                                    if "status" in tool_data:
-                                        summary = f"Tool {tool_name} completed with status: {tool_data['status']}"
-                                        if "jobs" in tool_data:
-                                            summary += f" (found {len(tool_data['jobs'])} jobs)"
-                                        elif "total_jobs" in tool_data:
-                                            summary += f" (total: {tool_data['total_jobs']} jobs)"
-                                    else:
-                                        summary = f"Tool {tool_name} returned data"
-                                else:
-                                    summary = (
-                                        f"Tool {tool_name} returned: {str(tool_data)[:100]}..."
-                                    )
-                            except json.JSONDecodeError:
-                                # If not JSON, show raw content
-                                summary = f"Tool {tool_name}: {tool_content[:100]}..."
-
-                            messages.append(
-                                ChatMessage(
-                                    role="assistant",
-                                    content=summary,
-                                    metadata={"title": f"🛠️ Used tool {tool_name}"},
-                                )
-                            )
-                            yield "", messages
-            else:
-                # Reset consecutive tool call counter when we get a non-tool response
-                consecutive_tool_calls = 0
-
-            # Handle final output - LangGraph uses different structures
-            if isinstance(chunk, dict):
-                # Check for various output formats
-                if "output" in chunk:
-                    messages.append(ChatMessage(role="assistant", content=chunk["output"]))
-                    yield "", messages
-                elif "messages" in chunk:
-                    # Extract assistant messages from the messages list
-                    for message in chunk["messages"]:
-                        if hasattr(message, "content") and message.content:
-                            # Skip tool messages and only include assistant messages
-                            if not _is_tool_message(message) and _is_assistant_message(message):
-                                messages.append(
-                                    ChatMessage(role="assistant", content=message.content)
-                                )
-                                yield "", messages
-                elif "agent" in chunk and "messages" in chunk["agent"]:
-                    # Old format - extract assistant messages
-                    for message in chunk["agent"]["messages"]:
-                        if hasattr(message, "content") and message.content:
-                            if not _is_tool_message(message) and _is_assistant_message(message):
-                                messages.append(
-                                    ChatMessage(role="assistant", content=message.content)
-                                )
-                                yield "", messages
+
+        if pending:
+            current_response.content = "".join(parts)
+            yield "", messages
 
         logger.info("Query processing completed successfully")
 
+    except GraphRecursionError as e:
+        logger.warning(f"Agent run aborted: {str(e)}")
+        messages.append(
+            ChatMessage(
+                role="assistant",
+                content=str(e),
+                metadata={"title": "❌ Loop Detected", "status": "done"},
+            )
+        )
+        yield "", messages
     except Exception as e:
         logger.error(f"Error processing query: {str(e)}", exc_info=True)
         messages.append(
@@ -214,39 +215,39 @@ async def explore_data(
         yield "", messages
 
 
-async def clear_conversation():
+async def clear_conversation(request: gr.Request = None):
     """Clear the conversation history."""
     global agent
     if agent:
-        clear_history(agent, DEFAULT_THREAD_ID)
+        await clear_history(agent, _thread_id(request))
         logger.info("Conversation history cleared")
         return "Conversation history cleared successfully."
     return "No agent available."
 
 
-async def get_conversation_summary():
+async def get_conversation_summary(request: gr.Request = None):
     """Get a summary of the current conversation."""
     global agent
     if agent:
-        summary = get_history_summary(agent, DEFAULT_THREAD_ID)
+        summary = await get_history_summary(agent, _thread_id(request))
         return summary
     return "No agent available."
 
 
-async def get_conversation_count():
+async def get_conversation_count(request: gr.Request = None):
     """Get the number of messages in the conversation."""
     global agent
     if agent:
-        count = len(get_messages(agent, DEFAULT_THREAD_ID))
+        count = len(await get_messages(agent, _thread_id(request)))
         return f"Conversation has {count} messages."
     return "No agent available."
 
 
-async def get_conversation_checkpoints():
+async def get_conversation_checkpoints(request: gr.Request = None):
     """Get checkpoint information for the current conversation."""
     global agent
     if agent:
-        checkpoints = get_thread_checkpoints(agent, DEFAULT_THREAD_ID)
+        checkpoints = await get_thread_checkpoints(agent, _thread_id(request))
         if checkpoints:
             checkpoint_info = "Conversation checkpoints:\n"
             for i, cp in enumerate(checkpoints[-5:], 1):  # Show last 5 checkpoints
@@ -358,10 +359,20 @@ def create_interface() -> gr.Blocks:
 
         checkpoints_btn.click(fn=get_conversation_checkpoints, inputs=[], outputs=[memory_output])
 
+    # Each event listener defaults to one concurrent run; explore_data is an async generator
+    # that only awaits model and MCP I/O, and every browser session has its own checkpoint
+    # thread, so many sessions can stream on the event loop at once
+    interface.queue(default_concurrency_limit=QUEUE_CONCURRENCY_LIMIT, max_size=QUEUE_MAX_SIZE)
+
     logger.info("Gradio interface with memory created successfully")
     return interface
 
 
+def create_app() -> FastAPI:
+    """Create the FastAPI application serving the Gradio interface."""
+    return gr.mount_gradio_app(FastAPI(), create_interface(), path="/")
+
+
 def main():
     """Run the Gradio web interface."""
     logging.basicConfig(
@@ -369,12 +380,19 @@ def main():
     )
     logger.info("Starting Data Explorer web interface...")
 
-    interface = create_interface()
-    logger.info("Launching Gradio interface on 0.0.0.0:7860")
-    interface.launch(
-        server_name="0.0.0.0",
-        server_port=7860,
-        share=False,
+    # Each worker process holds its own agent and conversation memory, and Gradio's event
+    # queue is per process, so more than one worker needs sticky sessions in front of it.
+    workers = int(os.getenv("WEB_WORKERS", "1"))
+    logger.info(f"Launching Gradio interface on 0.0.0.0:7860 with {workers} worker(s)")
+    # "auto" picks uvloop and httptools when they are installed
+    uvicorn.run(
+        "data_explorer.web:create_app",
+        factory=True,
+        host="0.0.0.0",
+        port=7860,
+        workers=workers,
+        loop="auto",
+        http="auto",
     )
 
 
@@ -2,58 +2,150 @@
 Agent module that implements a RAG-based agent using LlamaIndex.
 """
 import os
+import threading
+import time
 from typing import List, Dict, Any, Optional
+import numpy as np
 from dotenv import load_dotenv
-from llama_index.llms.openai import OpenAI
-from llama_index.core.agent import ReActAgent
-from llama_index.core.tools import QueryEngineTool
-from llama_index.core.memory import ChatMemoryBuffer
-from llama_index.core import VectorStoreIndex, StorageContext, Settings
-from llama_index.vector_stores.elasticsearch import ElasticsearchStore
-from llama_index.embeddings.elasticsearch import ElasticsearchEmbedding
-from elasticsearch import AsyncElasticsearch
 import logging
-from llama_index.core.tools.types import ToolMetadata
+# llama_index and elasticsearch are imported where they are used; they are slow to import
+# and only needed once a query is actually processed
 # Configure logging
 logger = logging.getLogger(__name__)
 
 load_dotenv()
 
-def create_query_engine() -> Any:
+
+class SemanticCache:
     """
-    Create a query engine for RAG using the Elasticsearch index.
+    In-process cache of agent responses keyed by the embedding of the question.
+
+    A question whose embedding has cosine similarity >= threshold with a cached one
+    reuses that answer instead of running retrieval and the LLM again.
     """
-    try:
-        # Get Elasticsearch configuration
+
+    def __init__(self, threshold: float = 0.92, ttl: float = 3600, max_entries: int = 1024):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._responses: List[str] = []
+        self._expires: List[float] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector: List[float]) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(v)
+        return v / norm if norm else v
+
+    def _evict(self, keep: np.ndarray) -> None:
+        self._vectors = self._vectors[keep]
+        self._responses = [r for r, k in zip(self._responses, keep) if k]
+        self._expires = [e for e, k in zip(self._expires, keep) if k]
+
+    def search(self, vector: List[float]) -> Optional[str]:
+        """Return the cached response closest to vector, if it is similar enough."""
+        with self._lock:
+            if not self._responses:
+                return None
+            expired = np.asarray(self._expires) <= time.time()
+            if expired.any():
+                self._evict(~expired)
+                if not self._responses:
+                    return None
+            # Rows are unit vectors, so the dot product is the cosine similarity
+            scores = self._vectors @ self._normalize(vector)
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                return self._responses[best]
+            return None
+
+    def add(self, vector: List[float], response: str) -> None:
+        """Cache response for the question embedded as vector."""
+        v = self._normalize(vector)
+        with self._lock:
+            if self._responses and len(self._responses) >= self.max_entries:
+                keep = np.ones(len(self._responses), dtype=bool)
+                keep[0] = False  # drop the oldest entry
+                self._evict(keep)
+            if self._responses:
+                self._vectors = np.vstack([self._vectors, v])
+            else:
+                self._vectors = v.reshape(1, -1)
+            self._responses.append(response)
+            self._expires.append(time.time() + self.ttl)
+
+
+_SEMANTIC_CACHE = SemanticCache(
+    threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+    ttl=float(os.getenv("SEMANTIC_CACHE_TTL", "3600")),
+)
+
+# Elasticsearch client shared by every query engine so its connection pool is reused
+_ES_CLIENT = None
+
+
+def get_es_client() -> Any:
+    """
+    Return the shared Elasticsearch client, creating it on first use.
+    """
+    global _ES_CLIENT
+    if _ES_CLIENT is None:
+        from elasticsearch import AsyncElasticsearch
+
         es_host = os.getenv("ELASTICSEARCH_HOST", "localhost")
         es_port = os.getenv("ELASTICSEARCH_PORT", "9200")
-        es_user = os.getenv("ELASTICSEARCH_USER")
-        es_password = os.getenv("ELASTICSEARCH_PASSWORD")
-        
-        # Create Elasticsearch client
-        es_client = AsyncElasticsearch(
+        _ES_CLIENT = AsyncElasticsearch(
             f"http://{es_host}:{es_port}",
-            basic_auth=(es_user, es_password),
-            verify_certs=False
+            basic_auth=(os.getenv("ELASTICSEARCH_USER"), os.getenv("ELASTICSEARCH_PASSWORD")),
+            verify_certs=False,
+            http_compress=True,
+            connections_per_node=32,
         )
-        
-        # Create vector store
+    return _ES_CLIENT
+
+
+# Embedding model shared by the query engine and the semantic cache lookup
+_EMBED_MODEL = None
+
+
+def get_embed_model() -> Any:
+    """
+    Return the shared Elasticsearch embedding model, creating it on first use.
+    """
+    global _EMBED_MODEL
+    if _EMBED_MODEL is None:
+        from llama_index.embeddings.elasticsearch import ElasticsearchEmbedding
+
+        es_host = os.getenv("ELASTICSEARCH_HOST", "localhost")
+        es_port = os.getenv("ELASTICSEARCH_PORT", "9200")
+        _EMBED_MODEL = ElasticsearchEmbedding.from_credentials(
+            model_id="baai__bge-base-en",
+            es_url=f"http://{es_host}:{es_port}",
+            es_username=os.getenv("ELASTICSEARCH_USER"),
+            es_password=os.getenv("ELASTICSEARCH_PASSWORD"),
+        )
+    return _EMBED_MODEL
+
+
+def create_query_engine() -> Any:
+    """
+    Create a query engine for RAG using the Elasticsearch index.
+    """
+    from llama_index.core import VectorStoreIndex, StorageContext, Settings
+    from llama_index.vector_stores.elasticsearch import ElasticsearchStore
+
+    try:
+        # Create vector store on the shared client
         vector_store = ElasticsearchStore(
-            es_client=es_client,
+            es_client=get_es_client(),
             index_name="light_emissivity_index",
             distance_strategy="COSINE"
         )
         
-        # Create embedding model
-        embeddings = ElasticsearchEmbedding.from_credentials(
-            model_id="baai__bge-base-en",
-            es_url=f"http://{es_host}:{es_port}",
-            es_username=es_user,
-            es_password=es_password
-        )
-        
         # Configure settings
-        Settings.embed_model = embeddings
+        Settings.embed_model = get_embed_model()
         Settings.chunk_size = 2048
         
         # Create storage context
@@ -67,11 +159,24 @@ def create_query_engine() -> Any:
             storage_context=storage_context
         )
         
-        # Create query engine
-        query_engine = index.as_query_engine(
-            similarity_top_k=5,
-            response_mode="tree_summarize"
-        )
+        # Create query engine. "compact" packs the retrieved chunks into as few LLM calls as
+        # fit the context window, instead of tree_summarize's layered summarization calls.
+        rerank_model = os.getenv("RERANK_MODEL")
+        if rerank_model:
+            # Retrieve wider and let a cross-encoder keep the best 3, so fewer prompt tokens
+            # reach the LLM for the same answer quality
+            from llama_index.core.postprocessor import SentenceTransformerRerank
+
+            query_engine = index.as_query_engine(
+                similarity_top_k=10,
+                response_mode="compact",
+                node_postprocessors=[SentenceTransformerRerank(model=rerank_model, top_n=3)]
+            )
+        else:
+            query_engine = index.as_query_engine(
+                similarity_top_k=5,
+                response_mode="compact"
+            )
         
         return query_engine
     except Exception as e:
@@ -82,6 +187,22 @@ def process_user_message(message: str, history: list) -> str:
     """
     Process a user message using the RAG-based agent.
     """
+    from llama_index.llms.openai import OpenAI
+    from llama_index.core.agent import ReActAgent
+    from llama_index.core.tools import QueryEngineTool
+    from llama_index.core.memory import ChatMemoryBuffer
+    from llama_index.core.tools.types import ToolMetadata
+
+    # Near-duplicate questions (e.g. the example queries) are answered from the cache, which
+    # only needs the embedding model; the query engine is built on a miss
+    query_embedding = get_embed_model().get_query_embedding(message)
+    cached = _SEMANTIC_CACHE.search(query_embedding)
+    if cached is not None:
+        logger.info("Semantic cache hit")
+        return cached
+
+    query_engine = create_query_engine()
+
     api_key = os.getenv("OPENAI_API_KEY")
     
     # Initialize the LLM
@@ -90,9 +211,6 @@ def process_user_message(message: str, history: list) -> str:
     # Create memory
     memory = ChatMemoryBuffer.from_defaults(token_limit=1500)
     
-    # Create the query engine
-    query_engine = create_query_engine()
-    
     # Create the query engine tool
     query_engine_tool = QueryEngineTool(
         query_engine=query_engine,
@@ -119,5 +237,6 @@ def process_user_message(message: str, history: list) -> str:
     )
     
     # Get response from agent
-    response = agent.chat(message)
-    return str(response) 
\ No newline at end of file
+    response = str(agent.chat(message))
+    _SEMANTIC_CACHE.add(query_embedding, response)
+    return response 
\ No newline at end of file
@@ -1,15 +1,18 @@
 """
 Script to ingest structured CSV data using LlamaIndex's VectorStoreIndex with Elasticsearch backend.
 """
+import numpy as np
 import pandas as pd
+import pyarrow.csv as pacsv
 from pathlib import Path
 from typing import List, Dict, Any
 from llama_index.core import (
     VectorStoreIndex,
     Document,
     Settings,
-    StorageContext,
 )
+from llama_index.core.ingestion import IngestionPipeline
+from llama_index.core.node_parser import SentenceSplitter
 from llama_index.vector_stores.elasticsearch import ElasticsearchStore
 from llama_index.embeddings.elasticsearch import ElasticsearchEmbedding
 from elasticsearch import AsyncElasticsearch
@@ -20,7 +23,9 @@ import glob
 import argparse
 import json
 import logging
+import re
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 
@@ -104,7 +109,12 @@ def setup_elasticsearch() -> ElasticsearchStore:
                         "type": "dense_vector",
                         "dims": 768,  # BGE base model dimensions
                         "index": True,
-                        "similarity": "cosine"
+                        "similarity": "cosine",
+                        # Quantize the HNSW graph to int8 so kNN reads a quarter of the bytes;
+                        # set VECTOR_ELEMENT_TYPE=bfloat16 on Elasticsearch 9.3+ to also halve
+                        # the stored vectors
+                        "element_type": os.getenv("VECTOR_ELEMENT_TYPE", "float"),
+                        "index_options": {"type": os.getenv("VECTOR_INDEX_TYPE", "int8_hnsw")}
                     },
                     "metadata": {
                         "type": "object",
@@ -126,11 +136,13 @@ def setup_elasticsearch() -> ElasticsearchStore:
         if not es_client.indices.exists(index=index_name):
             es_client.indices.create(index=index_name, body=mapping)
         
+        # The store writes nodes with the async _bulk helper; send 500 documents per request
+        # rather than the default 200 to cut round trips during ingestion
         vector_store = ElasticsearchStore(
             es_client=es_client,
             index_name=index_name,
             distance_strategy="COSINE",
-
+            batch_size=int(os.getenv("ES_BULK_CHUNK_SIZE", "500")),
         )
         
         logger.info("Connected to Elasticsearch vector store")
@@ -144,17 +156,16 @@ def load_csv_data(csv_file: Path) -> pd.DataFrame:
     Load and preprocess CSV data into a pandas DataFrame.
     """
     try:
-        # Read CSV file
-        df = pd.read_csv(csv_file)
-        
-        # Convert numeric columns appropriately
-        for col in df.columns:
-            # Try to convert to numeric if possible
-            try:
-                df[col] = pd.to_numeric(df[col])
-            except (ValueError, TypeError):
-                # If conversion fails, keep as is
-                pass
+        # Parse with pyarrow's multithreaded reader in 8 MiB blocks; numeric column types
+        # are inferred while parsing. to_pandas() keeps numpy dtypes so create_documents
+        # can classify the columns.
+        table = pacsv.read_csv(
+            csv_file,
+            read_options=pacsv.ReadOptions(use_threads=True, block_size=8 << 20),
+            # Empty cells become nulls (NaN in pandas), as they did with pandas' own reader
+            convert_options=pacsv.ConvertOptions(strings_can_be_null=True),
+        )
+        df = table.to_pandas()
         
         logger.info(f"Loaded DataFrame with shape: {df.shape}")
         return df
@@ -162,6 +173,9 @@ def load_csv_data(csv_file: Path) -> pd.DataFrame:
         logger.error(f"Error loading CSV data: {e}")
         raise
 
+_SANITIZE_TABLE = str.maketrans({' ': '_', '-': '_', '.': '_'})
+_NON_WORD = re.compile(r'\W')
+
 def sanitize_field_name(field_name: str) -> str:
     """
     Sanitize field names to be Elasticsearch-friendly by:
@@ -169,13 +183,9 @@ def sanitize_field_name(field_name: str) -> str:
     2. Replacing spaces and special characters with underscores
     3. Removing any remaining special characters
     """
-    # Convert to lowercase
-    field_name = field_name.lower()
-    # Replace spaces and special characters with underscores
-    field_name = field_name.replace(' ', '_').replace('-', '_').replace('.', '_')
-    # Remove any remaining special characters
-    field_name = ''.join(c for c in field_name if c.isalnum() or c == '_')
-    return field_name
+    # Lowercase and map spaces, dashes and dots to underscores in one C-level pass, then
+    # strip everything that isn't a word character
+    return _NON_WORD.sub('', field_name.lower().translate(_SANITIZE_TABLE))
 
 def create_documents(df: pd.DataFrame, file_name: str) -> List[Document]:
     """
@@ -194,14 +204,65 @@ def create_documents(df: pd.DataFrame, file_name: str) -> List[Document]:
     # Create mapping of original column names to sanitized names
     column_mapping = {col: sanitize_field_name(col) for col in df.columns}
     
-    for _, row in df.iterrows():
-        # Create text representation for semantic search
+    # Pull each column group out as a 2D array once, with its not-null mask, instead of
+    # boxing every cell into a per-row Series via iterrows
+    num_vals = df[numeric_cols].to_numpy(dtype=float, na_value=np.nan)
+    num_raw = df[numeric_cols].to_numpy(dtype=object)
+    num_mask = ~np.isnan(num_vals)
+    txt_vals = df[text_cols].to_numpy(dtype=object)
+    txt_mask = df[text_cols].notna().to_numpy()
+    date_vals = df[date_cols].to_numpy(dtype=object)
+    date_mask = df[date_cols].notna().to_numpy()
+    row_ids = df.index.astype(str)
+    
+    # Column-level work is done once: sanitized names by position and "column: " prefixes
+    num_names = [column_mapping[col] for col in numeric_cols]
+    txt_names = [column_mapping[col] for col in text_cols]
+    date_names = [column_mapping[col] for col in date_cols]
+    num_prefixes = [f"{col}: " for col in numeric_cols]
+    txt_prefixes = [f"{col}: " for col in text_cols]
+    date_prefixes = [f"{col}: " for col in date_cols]
+    
+    # Build the semantic-search text of every row with column-wise string operations:
+    # each present "column: value" part is appended with a " | " separator where needed
+    texts = pd.Series("", index=df.index, dtype=object)
+    empty = pd.Series(True, index=df.index)
+    for col, prefix in zip(text_cols, txt_prefixes):
+        present = df[col].notna()
+        separator = pd.Series(np.where(empty, "", " | "), index=df.index)
+        texts = texts.mask(present, texts + separator + prefix + df[col].astype(str))
+        empty &= ~present
+    texts = texts.tolist()
+    
+    for i in range(len(df)):
+        # Text fields with sanitized names
+        text_fields = {}
         text_parts = []
-        for col in text_cols:
-            if pd.notna(row[col]):
-                text_parts.append(f"{col}: {row[col]}")
+        for name, prefix, value, present in zip(txt_names, txt_prefixes, txt_vals[i], txt_mask[i]):
+            if present:
+                value = str(value)
+                text_fields[name] = value
+                text_parts.append(prefix + value)
+        
+        text = texts[i]
         
-        text = " | ".join(text_parts)
+        # Numeric fields with sanitized names
+        numeric_fields = {}
+        numeric_parts = []
+        numeric_row = zip(num_names, num_prefixes, num_vals[i].tolist(), num_raw[i], num_mask[i])
+        for name, prefix, value, raw, present in numeric_row:
+            if present:
+                numeric_fields[name] = value
+                numeric_parts.append(prefix + str(raw))
+        
+        # Date fields with sanitized names
+        date_fields = {}
+        date_parts = []
+        for name, prefix, value, present in zip(date_names, date_prefixes, date_vals[i], date_mask[i]):
+            if present:
+                value = str(value)
+                date_fields[name] = value
+                date_parts.append(prefix + value)
         
         # Create location field if latitude and longitude exist
         # location = None
@@ -215,37 +276,16 @@ def create_documents(df: pd.DataFrame, file_name: str) -> List[Document]:
         # Create structured metadata according to index mapping
         metadata = {
             "file_name": file_name,
-            "row_id": str(row.name),
-            "numeric_fields": {},
-            "text_fields": {},
-            "date_fields": {},
-            "all_fields": [],
+            "row_id": row_ids[i],
+            "numeric_fields": numeric_fields,
+            "text_fields": text_fields,
+            "date_fields": date_fields,
+            "all_fields": numeric_parts + text_parts + date_parts,
         }
 
         # if location:
         #     metadata["location"] = location
         
-        # Add numeric fields with sanitized names
-        for col in numeric_cols:
-            if pd.notna(row[col]):
-                sanitized_name = column_mapping[col]
-                metadata["numeric_fields"][sanitized_name] = float(row[col])
-                metadata["all_fields"].append(f"{col}: {row[col]}")
-        
-        # Add text fields with sanitized names
-        for col in text_cols:
-            if pd.notna(row[col]):
-                sanitized_name = column_mapping[col]
-                metadata["text_fields"][sanitized_name] = str(row[col])
-                metadata["all_fields"].append(f"{col}: {row[col]}")
-        
-        # Add date fields with sanitized names
-        for col in date_cols:
-            if pd.notna(row[col]):
-                sanitized_name = column_mapping[col]
-                metadata["date_fields"][sanitized_name] = str(row[col])
-                metadata["all_fields"].append(f"{col}: {row[col]}")
-        
         # Create document with structured metadata
         doc_kwargs = {"text": text, "metadata": metadata}
 
@@ -254,6 +294,19 @@ def create_documents(df: pd.DataFrame, file_name: str) -> List[Document]:
     
     return documents
 
+class BatchedElasticsearchEmbedding(ElasticsearchEmbedding):
+    """
+    Elasticsearch embedding that sends a whole batch of texts in one inference request
+    instead of one request per text.
+    """
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        response = self._client.infer_trained_model(
+            model_id=self.model_id,
+            docs=[{self.input_field: text} for text in texts],
+        )
+        return [result["predicted_value"] for result in response["inference_results"]]
+
 def create_index(
     df: pd.DataFrame,
     vector_store: ElasticsearchStore,
@@ -263,33 +316,49 @@ def create_index(
     Create a VectorStoreIndex from the DataFrame with Elasticsearch backend.
     """
     try:
-        # Create Elasticsearch embedding model with async support
-        embeddings = ElasticsearchEmbedding.from_credentials(
-            model_id="baai__bge-base-en",
-            es_url=f"http://{os.getenv('ELASTICSEARCH_HOST', 'localhost')}:{os.getenv('ELASTICSEARCH_PORT', '9200')}",
-            es_username=os.getenv('ELASTICSEARCH_USER'),
-            es_password=os.getenv('ELASTICSEARCH_PASSWORD')
-        )
+        if os.getenv("EMBED_BACKEND", "elasticsearch") == "local":
+            # Embed in local batches with the same BGE model the cluster serves, so vectors
+            # stay compatible with query-time embeddings from the Elasticsearch endpoint
+            from llama_index.embeddings.huggingface import HuggingFaceEmbedding
+
+            embeddings = HuggingFaceEmbedding(
+                model_name="BAAI/bge-base-en",
+                embed_batch_size=int(os.getenv("EMBED_BATCH_SIZE", "128")),
+                normalize=True,
+            )
+        else:
+            # Create Elasticsearch embedding model, embedding batches of texts per request
+            embeddings = BatchedElasticsearchEmbedding.from_credentials(
+                model_id="baai__bge-base-en",
+                es_url=f"http://{os.getenv('ELASTICSEARCH_HOST', 'localhost')}:{os.getenv('ELASTICSEARCH_PORT', '9200')}",
+                es_username=os.getenv('ELASTICSEARCH_USER'),
+                es_password=os.getenv('ELASTICSEARCH_PASSWORD')
+            )
+            embeddings.embed_batch_size = int(os.getenv("EMBED_BATCH_SIZE", "64"))
         
         # Configure global settings with increased chunk size
         Settings.embed_model = embeddings
         Settings.chunk_size = 2048  # Increased from 512 to handle larger metadata
         
-        # Create storage context with Elasticsearch
-        storage_context = StorageContext.from_defaults(
-            vector_store=vector_store
-        )
-        
         # Create documents with structured metadata
         documents = create_documents(df, file_name)
         
-        # Create index from documents
-        index = VectorStoreIndex.from_documents(
-            documents,
-            storage_context=storage_context,
-            show_progress=True,
-            response_mode="tree_summarize"
+        # Split and embed the documents across worker processes, then write the nodes to
+        # the Elasticsearch vector store
+        pipeline = IngestionPipeline(
+            transformations=[SentenceSplitter(chunk_size=2048), embeddings],
+            vector_store=vector_store
         )
+        # Worker processes get a pickled copy of the transformations, which drops the
+        # Elasticsearch embedding's live client, so only local embeddings are spread out
+        if os.getenv("EMBED_BACKEND", "elasticsearch") == "local":
+            num_workers = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 1)))
+        else:
+            num_workers = 1
+        pipeline.run(documents=documents, num_workers=num_workers, show_progress=True)
+        
+        # Create index over the populated vector store
+        index = VectorStoreIndex.from_vector_store(vector_store)
         
         logger.info(f"Successfully created index from DataFrame")
         return index
@@ -311,7 +380,7 @@ def process_csv_file(csv_file: Path, vector_store: ElasticsearchStore) -> None:
         index = create_index(df, vector_store, csv_file.name)
         
         # Create query engine
-        query_engine = index.as_query_engine(response_mode="tree_summarize")
+        query_engine = index.as_query_engine(response_mode="compact")
         
         # Optional: Test a query
         response = query_engine.query(
@@ -322,6 +391,21 @@ def process_csv_file(csv_file: Path, vector_store: ElasticsearchStore) -> None:
         
     except Exception as e:
         logger.error(f"Error processing {csv_file.name}: {e}", exc_info=True)
+        raise
+
+def _init_ingest_worker(ingest_workers: int) -> None:
+    """
+    Share the cores between file workers so each file's ingestion pipeline doesn't
+    start a full set of embedding processes of its own.
+    """
+    os.environ.setdefault("INGEST_WORKERS", str(ingest_workers))
+
+def _process_csv_file_in_worker(csv_file: Path) -> None:
+    """
+    Process a CSV file in a worker process. The vector store holds a live client and
+    can't be pickled, so each worker sets up its own.
+    """
+    process_csv_file(csv_file, setup_elasticsearch())
 
 def main():
     # Set up argument parser
@@ -334,8 +418,8 @@ def main():
     )
     args = parser.parse_args()
     
-    # Set up Elasticsearch vector store
-    vector_store = setup_elasticsearch()
+    # Set up Elasticsearch vector store (creates the index before any worker writes to it)
+    setup_elasticsearch()
     
     # Get the data directory path
     if args.data_dir:
@@ -360,10 +444,24 @@ def main():
     
     logger.info(f"Found {len(csv_files)} CSV files to process in {data_dir}")
     
-    # Process each CSV file
-    for csv_file in csv_files:
-        process_csv_file(csv_file, vector_store)
+    # Process the files in parallel; the worker count also caps the concurrent ingest load
+    # on the cluster
+    max_workers = min(len(csv_files), int(os.getenv("INGEST_FILE_WORKERS", "4")))
+    ingest_workers = max(1, (os.cpu_count() or 1) // max_workers)
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_init_ingest_worker,
+        initargs=(ingest_workers,),
+    ) as executor:
+        futures = {
+            executor.submit(_process_csv_file_in_worker, csv_file): csv_file
+            for csv_file in csv_files
+        }
+        failed = [csv_file.name for future, csv_file in futures.items() if future.exception()]
     
+    if failed:
+        logger.error(f"\n{len(failed)} of {len(csv_files)} files failed: {', '.join(failed)}")
+        sys.exit(1)
     logger.info("\nAll files processed successfully!")
 
 if __name__ == "__main__":
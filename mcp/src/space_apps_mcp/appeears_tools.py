@@ -1,44 +1,230 @@
+import contextlib
+import functools
 import os
 import requests
-import json
-from typing import List, Dict, Any
-from datetime import datetime, timedelta, timezone
+import logging
+import shutil
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Dict, Any, Iterator, Optional, Union
+from datetime import date, datetime, timedelta
+import diskcache
+import msgspec
+import orjson
+from cachetools import LRUCache, TTLCache
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+
+class _KeyedLocks:
+    """One lock per key, dropped once nobody holds or waits on it."""
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks: Dict[str, List[Any]] = {}
+
+    @contextlib.contextmanager
+    def __call__(self, key: str) -> Iterator[None]:
+        with self._guard:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._guard:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+
+
+# The product catalogue rarely changes, so product and layer listings are kept for an hour
+_PRODUCT_CACHE: TTLCache = TTLCache(maxsize=128, ttl=3600)
+_PRODUCT_CACHE_LOCK = threading.Lock()
+# Held across a cache miss so concurrent callers wait for one fetch of that listing instead of
+# each calling the API, without holding up lookups of other products
+_PRODUCT_FETCH_LOCKS = _KeyedLocks()
+# Behind the in-memory cache, listings are also kept on disk for a week so a restarted
+# server doesn't have to fetch them again
+_PRODUCT_DISK_CACHE_TTL = 7 * 24 * 3600
+
+
+@functools.lru_cache(maxsize=None)
+def _product_disk_cache() -> diskcache.Cache:
+    """Open the on-disk listing cache, creating its directory, on the first product lookup."""
+    return diskcache.Cache(
+        os.path.expanduser(os.getenv("MCP_CACHE_DIR", "~/.cache/space-apps-mcp"))
+    )
+
+
+# A bundle can only be listed once its task is done and never changes afterwards, so file
+# listings are kept until evicted and a download reuses the listing fetched before it
+_BUNDLE_CACHE: LRUCache = LRUCache(maxsize=256)
+# LRUCache reorders itself on every get, so reads take the lock too
+_BUNDLE_CACHE_LOCK = threading.Lock()
+# Held across a listing's fetch, per task, so other bundles can be listed meanwhile
+_BUNDLE_FETCH_LOCKS = _KeyedLocks()
+
+# Last ETag / Last-Modified and body seen per task, so a status poll can be revalidated with a
+# conditional GET and an unchanged task costs an empty 304 instead of a full JSON body
+_TASK_VALIDATORS: LRUCache = LRUCache(maxsize=256)
+_TASK_VALIDATORS_LOCK = threading.Lock()
+
+# Task states after which polling can stop
+_FINISHED_TASK_STATES = frozenset({"done", "error", "deleted", "expired"})
+
+# Bytes copied per read/write when saving bundle files
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+
+def _create_session() -> requests.Session:
+    """Create the HTTP session shared by every AppEEARSTools instance."""
+    # Keep-alive pool sized for concurrent tool calls and parallel bundle downloads; streamed
+    # downloads hold their connection after releasing a request slot, so it is larger than
+    # APPEEARS_MAX_CONCURRENCY. Transient gateway errors are retried with backoff; urllib3
+    # only retries idempotent methods on a bad status, so task submissions are never sent twice.
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=16,
+        pool_maxsize=int(os.getenv("APPEEARS_POOL_SIZE", "64")),
+        # Concurrency is already capped by the request slots; past the pool size a request
+        # opens a one-off connection rather than waiting for a pooled one to be returned
+        pool_block=False,
+        max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504]),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # JSON responses (task lists, bundle listings) compress well; bundle downloads override
+    # this with identity since they are written to disk as-is
+    session.headers["Accept-Encoding"] = "gzip, deflate"
+    return session
+
+
+# One connection pool per process, whichever instance makes the request
+_SESSION = _create_session()
+
+
+def _json(response: requests.Response) -> Any:
+    """Decode a JSON response body with orjson, which is much faster than response.json()."""
+    return orjson.loads(response.content)
+
+
+if sys.version_info >= (3, 11):
+    # fromisoformat accepts the trailing "Z" AppEEARS uses from Python 3.11 on
+    _fromisoformat = datetime.fromisoformat
+else:
+
+    def _fromisoformat(value: str) -> datetime:
+        """Parse an ISO 8601 timestamp, including a trailing "Z" for UTC."""
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+# A task's timestamps never change but are parsed again every time its status is polled
+_parse_iso_datetime = functools.lru_cache(maxsize=1024)(_fromisoformat)
+
+
+def _preallocate(f, size: int) -> None:
+    """Reserve disk space for a download so parallel writers don't fragment each other's files."""
+    if not hasattr(os, "posix_fallocate"):
+        return
+    try:
+        os.posix_fallocate(f.fileno(), 0, size)
+    except OSError:
+        # Not supported by every filesystem; the write just proceeds without it
+        pass
+
+
+def _iso_to_appeears(value: str) -> str:
+    """Convert a YYYY-MM-DD date to the MM-DD-YYYY format AppEEARS expects."""
+    # fromisoformat validates the date in C; the length check rejects the compact
+    # YYYYMMDD form that Python 3.11+ also accepts, which the slicing can't handle
+    if len(value) != 10:
+        raise ValueError(f"Invalid isoformat string: {value!r}")
+    date.fromisoformat(value)
+    return f"{value[5:7]}-{value[8:10]}-{value[0:4]}"
+
+
+class LayerRef(msgspec.Struct):
+    """A layer of a product, as AppEEARS expects it in a task request."""
+
+    layer: str
+    product: str
+
+
+class Location(msgspec.Struct):
+    """A point location, as AppEEARS expects it in a task request."""
+
+    id: Union[str, int]
+    category: str
+    latitude: float
+    longitude: float
+
+
+# Task bodies are encoded straight to bytes instead of going through requests' json=
+_TASK_ENCODER = msgspec.json.Encoder()
+
 
 class AppEEARSTools:
+    _singleton: Optional["AppEEARSTools"] = None
+    _singleton_lock = threading.Lock()
+
     def __init__(self):
         self.base_url = os.getenv(
             "APPEEARS_API_URL", "https://appeears.earthdatacloud.nasa.gov/api"
         )
-        self.session = requests.Session()
+        self.session = _SESSION
         self.username = os.getenv("APPEEARS_USERNAME", "")
         self.password = os.getenv("APPEEARS_PASSWORD", "")
         self.token = None
         self.token_expiry = None
-        self._refresh_token()
+        # token_expiry as an epoch timestamp, compared on every request without taking the lock
+        self._token_expiry_ts = 0.0
+        self._token_lock = threading.Lock()
+        # Renews the token in the background before it expires, so no tool call waits on a login
+        self._refresh_timer: Optional[threading.Timer] = None
+        # Caps in-flight API requests across all threads (tool calls, status fan-outs and
+        # downloads) so concurrent callers can't overload the AppEEARS API
+        self._request_slots = threading.BoundedSemaphore(
+            int(os.getenv("APPEEARS_MAX_CONCURRENCY", "16"))
+        )
+        # No login here: _ensure_valid_token logs in on the first request, so creating the
+        # client costs no network round-trip
+
+    @classmethod
+    def instance(cls) -> "AppEEARSTools":
+        """Return the process-wide client so the session, token and connection pool are shared."""
+        if cls._singleton is None:
+            with cls._singleton_lock:
+                if cls._singleton is None:
+                    cls._singleton = cls()
+        return cls._singleton
 
     def _refresh_token(self) -> None:
         """Get a new authentication token from the AppEEARS API."""
         try:
-            response = requests.post(
+            response = self.session.post(
                 f"{self.base_url}/login",
                 auth=(self.username, self.password),
             )
             response.raise_for_status()
-            token_data = response.json()
+            token_data = _json(response)
 
             # Store the token and its expiration
             self.token = token_data["token"]
             # Parse the expiration time from ISO format with timezone
-            self.token_expiry = datetime.fromisoformat(
-                token_data["expiration"].replace("Z", "+00:00")
-            )
+            self.token_expiry = _parse_iso_datetime(token_data["expiration"])
 
             # Set a buffer of 5 minutes before actual expiry
             self.token_expiry = self.token_expiry - timedelta(minutes=5)
+            self._token_expiry_ts = self.token_expiry.timestamp()
+            self._schedule_refresh()
         except requests.exceptions.HTTPError as e:
             if e.response.status_code == 401:
                 raise Exception("Invalid AppEEARS credentials")
@@ -46,36 +232,72 @@ class AppEEARSTools:
         except Exception as e:
             raise Exception(f"Failed to get authentication token: {str(e)}")
 
+    def _schedule_refresh(self) -> None:
+        """Arm the background refresh for 80% of the way to the current token's expiry."""
+        if self._refresh_timer is not None:
+            self._refresh_timer.cancel()
+        # At least a minute apart, so a short-lived token can't turn this into a login loop
+        delay = max(0.8 * (self._token_expiry_ts - time.time()), 60.0)
+        self._refresh_timer = threading.Timer(delay, self._refresh_in_background)
+        self._refresh_timer.daemon = True
+        self._refresh_timer.start()
+
+    def _refresh_in_background(self) -> None:
+        """Log in again ahead of expiry; on failure the next request logs in itself."""
+        try:
+            with self._token_lock:
+                self._refresh_token()
+        except Exception as e:
+            logger.warning(f"Background AppEEARS token refresh failed: {str(e)}")
+
     def _ensure_valid_token(self) -> None:
         """Ensure we have a valid token, refreshing if necessary."""
-        if (
-            not self.token
-            or not self.token_expiry
-            or datetime.now(timezone.utc) >= self.token_expiry
-        ):
-            self._refresh_token()
+        # Fast path: a fresh token is read without locking; the token and its expiry are
+        # replaced by plain attribute assignment, so readers never see a torn value
+        if self.token and time.time() < self._token_expiry_ts:
+            return
+
+        # Serialize refreshes so concurrent callers don't each POST to /login
+        with self._token_lock:
+            if not self.token or time.time() >= self._token_expiry_ts:
+                self._refresh_token()
+
+    def _invalidate_token(self, token: str) -> None:
+        """Forget token so the next request logs in again, unless another thread already did."""
+        with self._token_lock:
+            if self.token == token:
+                self._token_expiry_ts = 0.0
 
     def _make_request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
         """Make an authenticated request to the AppEEARS API."""
-        import logging
-
-        logger = logging.getLogger(__name__)
-
         self._ensure_valid_token()
 
         # Add authentication header
         headers = kwargs.pop("headers", {})
-        headers.update({"Authorization": f"Bearer {self.token}"})
+        token = self.token
+        headers.update({"Authorization": f"Bearer {token}"})
 
         url = f"{self.base_url}/{endpoint}"
-        logger.info(f"Making {method} request to: {url}")
-        logger.debug(f"Request headers: {headers}")
-        logger.debug(f"Request kwargs: {kwargs}")
+        logger.info("Making %s request to: %s", method, url)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            logger.debug("Request headers: %s", headers)
+            logger.debug("Request kwargs: %s", kwargs)
 
         try:
-            response = self.session.request(method, url, headers=headers, **kwargs)
-            logger.info(f"Response status: {response.status_code}")
-            logger.debug(f"Response headers: {dict(response.headers)}")
+            with self._request_slots:
+                response = self.session.request(method, url, headers=headers, **kwargs)
+            if response.status_code == 401:
+                # The token was revoked or expired early: drop it and retry once with a new one
+                response.close()
+                self._invalidate_token(token)
+                self._ensure_valid_token()
+                headers["Authorization"] = f"Bearer {self.token}"
+                with self._request_slots:
+                    response = self.session.request(method, url, headers=headers, **kwargs)
+            logger.info("Response status: %s", response.status_code)
+            if debug:
+                logger.debug("Response headers: %s", dict(response.headers))
 
             response.raise_for_status()
             return response
@@ -86,26 +308,56 @@ class AppEEARSTools:
                 logger.error(f"Response content: {e.response.text}")
             raise
 
+    def _cached_listing(self, key: str, fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return a listing from memory, then disk, then fetch(); errors aren't cached."""
+        with _PRODUCT_CACHE_LOCK:
+            cached = _PRODUCT_CACHE.get(key)
+        if cached is not None:
+            return cached
+
+        with _PRODUCT_FETCH_LOCKS(key):
+            with _PRODUCT_CACHE_LOCK:
+                cached = _PRODUCT_CACHE.get(key)
+            if cached is not None:
+                return cached
+            result = _product_disk_cache().get(key)
+            if result is None:
+                result = fetch()
+                if result["status"] != "success":
+                    return result
+                _product_disk_cache().set(key, result, expire=_PRODUCT_DISK_CACHE_TTL)
+            with _PRODUCT_CACHE_LOCK:
+                _PRODUCT_CACHE[key] = result
+            return result
+
     def _list_products(self) -> Dict[str, Any]:
         """List all available AppEEARS products"""
-        try:
-            response = self._make_request("GET", "product")
-            return {"status": "success", "products": response.json()}
-        except Exception as e:
-            return {"status": "error", "message": str(e)}
+
+        def fetch() -> Dict[str, Any]:
+            try:
+                response = self._make_request("GET", "product")
+                return {"status": "success", "products": _json(response)}
+            except Exception as e:
+                return {"status": "error", "message": str(e)}
+
+        return self._cached_listing("products", fetch)
 
     def _get_layers(self, product_and_version: str) -> Dict[str, Any]:
         """List available layers for a given product."""
-        try:
-            response = self._make_request("GET", f"product/{product_and_version}")
-            layers = response.json()
-            if not layers:
-                return {"status": "error", "message": "No layers found for this product."}
 
-            layer_info = {k: v.get("Description", "") for k, v in layers.items()}
-            return {"status": "success", "layers": layer_info}
-        except Exception as e:
-            return {"status": "error", "message": str(e)}
+        def fetch() -> Dict[str, Any]:
+            try:
+                response = self._make_request("GET", f"product/{product_and_version}")
+                layers = _json(response)
+                if not layers:
+                    return {"status": "error", "message": "No layers found for this product."}
+
+                layer_info = {k: v.get("Description", "") for k, v in layers.items()}
+                return {"status": "success", "layers": layer_info}
+            except Exception as e:
+                return {"status": "error", "message": str(e)}
+
+        return self._cached_listing(f"layers:{product_and_version}", fetch)
 
     def _submit_point_request(
         self,
@@ -127,38 +379,189 @@ class AppEEARSTools:
         """
         try:
             # Format dates to MM/DD/YYYY
-            start_date = datetime.strptime(start_date, "%Y-%m-%d").strftime("%m-%d-%Y")
-            end_date = datetime.strptime(end_date, "%Y-%m-%d").strftime("%m-%d-%Y")
+            start_date = _iso_to_appeears(start_date)
+            end_date = _iso_to_appeears(end_date)
 
+            # Validated in C before anything is sent; a bad entry raises msgspec.ValidationError
+            # naming the offending field
             task = {
                 "task_type": "point",
                 "task_name": task_name,
                 "params": {
                     "dates": [{"startDate": start_date, "endDate": end_date}],
-                    "layers": layers,
-                    "coordinates": locations,
+                    "layers": msgspec.convert(layers, List[LayerRef]),
+                    "coordinates": msgspec.convert(locations, List[Location]),
                 },
             }
-            print(f"Submitting task: {json.dumps(task, indent=2)}")
-            response = self._make_request("POST", "task", json=task)
-            task_id = response.json()["task_id"]
+            # Formatted lazily, and only when DEBUG is enabled
+            logger.debug("Submitting task: %s", task)
+            response = self._make_request(
+                "POST",
+                "task",
+                data=_TASK_ENCODER.encode(task),
+                headers={"Content-Type": "application/json"},
+            )
+            task_id = _json(response)["task_id"]
             return {
                 "status": "success",
                 "task_id": task_id,
                 "message": f"Task submitted! Task ID: {task_id}",
             }
         except Exception as e:
-            print(f"Error submitting task: {str(e)}")
+            logger.error(f"Error submitting task: {str(e)}")
             return {"status": "error", "message": str(e)}
 
+    def _submit_point_requests(
+        self,
+        layers: List[Dict[str, str]],
+        locations: List[Dict[str, Any]],
+        start_date: str,
+        end_date: str,
+        task_name: str = "LlamaAgentTask",
+        locations_per_task: int = 100,
+    ) -> Dict[str, Any]:
+        """
+        Submit a large point request as several smaller AppEEARS tasks.
+
+        The locations are split into groups of locations_per_task and the resulting tasks are
+        submitted concurrently, so AppEEARS can process them in parallel instead of working
+        through one very large task.
+
+        Args:
+            layers: List of layers to request, each with keys layer and product
+            locations: List of locations, each with keys id, category, latitude and longitude
+            start_date: Start date for the request (YYYY-MM-DD)
+            end_date: End date for the request (YYYY-MM-DD)
+            task_name: Base name of the tasks; each gets a _<n> suffix
+            locations_per_task: Maximum number of locations in a single task
+
+        Returns:
+            Dictionary with the submitted task IDs and any per-task errors
+        """
+        groups = [
+            locations[i : i + locations_per_task]
+            for i in range(0, len(locations), max(1, locations_per_task))
+        ]
+        if not groups:
+            return {"status": "error", "message": "No locations to submit."}
+
+        def submit(numbered_group):
+            number, group = numbered_group
+            return self._submit_point_request(
+                layers, group, start_date, end_date, f"{task_name}_{number}"
+            )
+
+        # A few submissions at a time keeps AppEEARS from throttling the burst
+        with ThreadPoolExecutor(max_workers=min(len(groups), 4)) as executor:
+            results = list(executor.map(submit, enumerate(groups, 1)))
+
+        task_ids = [r["task_id"] for r in results if r["status"] == "success"]
+        errors = [r["message"] for r in results if r["status"] != "success"]
+        if not task_ids:
+            return {"status": "error", "message": "; ".join(errors)}
+        return {
+            "status": "success",
+            "task_ids": task_ids,
+            "errors": errors,
+            "message": f"Submitted {len(task_ids)} of {len(groups)} tasks.",
+        }
+
     def _get_task_status(self, task_id: str) -> Dict[str, Any]:
         """Get the status of an AppEEARS task"""
+        with _TASK_VALIDATORS_LOCK:
+            previous = _TASK_VALIDATORS.get(task_id)
+        headers = {}
+        if previous is not None:
+            etag, last_modified, _ = previous
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
         try:
-            response = self._make_request("GET", f"task/{task_id}")
-            return {"status": "success", "task_status": response.json()}
+            response = self._make_request("GET", f"task/{task_id}", headers=headers)
+            if response.status_code == 304 and previous is not None:
+                return {"status": "success", "task_status": previous[2]}
+
+            task_status = _json(response)
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if etag or last_modified:
+                with _TASK_VALIDATORS_LOCK:
+                    _TASK_VALIDATORS[task_id] = (etag, last_modified, task_status)
+            return {"status": "success", "task_status": task_status}
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
+    def _get_task_statuses(self, task_ids: List[str]) -> Dict[str, Any]:
+        """
+        Get the status of several AppEEARS tasks in one call.
+
+        The status requests are issued concurrently, so polling N tasks costs roughly one
+        round trip instead of N.
+
+        Args:
+            task_ids: The task identifiers to check
+
+        Returns:
+            Dictionary with the per-task status results keyed by task_id
+        """
+        unique_ids = list(dict.fromkeys(task_ids))
+        if not unique_ids:
+            return {"status": "success", "tasks": {}}
+
+        max_workers = min(len(unique_ids), int(os.getenv("APPEEARS_DOWNLOAD_CONCURRENCY", "8")))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(self._get_task_status, unique_ids)
+            tasks = dict(zip(unique_ids, results))
+
+        return {"status": "success", "tasks": tasks}
+
+    def _wait_for_task(
+        self,
+        task_id: str,
+        timeout: float = 3600,
+        poll_interval: float = 1.0,
+        max_interval: float = 60.0,
+    ) -> Dict[str, Any]:
+        """
+        Wait until an AppEEARS task finishes, polling with exponential backoff.
+
+        Polls after poll_interval seconds, doubling the wait each time up to max_interval,
+        so a long task costs a few dozen status requests instead of one per fixed interval.
+
+        Args:
+            task_id: The task identifier
+            timeout: Maximum number of seconds to wait
+            poll_interval: Seconds before the first re-check
+            max_interval: Longest wait between two checks
+
+        Returns:
+            Dictionary with the final task status and the seconds waited, or an error if the
+            wait timed out
+        """
+        delay = poll_interval
+        start = time.monotonic()
+        deadline = start + timeout
+        while True:
+            result = self._get_task_status(task_id)
+            if result["status"] != "success":
+                return result
+            if result["task_status"].get("status") in _FINISHED_TASK_STATES:
+                result["elapsed_time"] = time.monotonic() - start
+                return result
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return {
+                    "status": "error",
+                    "message": f"Timed out after {timeout} seconds waiting for task {task_id}",
+                    "task_status": result["task_status"],
+                    "elapsed_time": time.monotonic() - start,
+                }
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, max_interval)
+
     def _list_bundle_files(self, task_id: str) -> Dict[str, Any]:
         """
         List files available in a bundle for a completed task.
@@ -173,29 +576,152 @@ class AppEEARSTools:
         Returns:
             Dictionary with list of files in the bundle
         """
-        import logging
+        with _BUNDLE_CACHE_LOCK:
+            cached = _BUNDLE_CACHE.get(task_id)
+        if cached is not None:
+            return cached
+
+        with _BUNDLE_FETCH_LOCKS(task_id):
+            with _BUNDLE_CACHE_LOCK:
+                cached = _BUNDLE_CACHE.get(task_id)
+            if cached is not None:
+                return cached
+            try:
+                logger.info(f"Listing bundle files for task_id: {task_id}")
+                response = self._make_request("GET", f"bundle/{task_id}")
+                files = _json(response)
+                # The full listing can be long, so it is only logged when debugging
+                logger.debug("Bundle files response for task_id %s: %s", task_id, files)
+
+                result = {"status": "success", "files": files}
+            except Exception as e:
+                logger.error(
+                    f"Error listing bundle files for task_id {task_id}: {str(e)}", exc_info=True
+                )
+                return {"status": "error", "message": str(e)}
+            with _BUNDLE_CACHE_LOCK:
+                _BUNDLE_CACHE[task_id] = result
+            return result
 
-        logger = logging.getLogger(__name__)
+    def _download_one(
+        self,
+        task_id: str,
+        file_info: Any,
+        task_folder: str,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Download a single bundle file into the task folder.
+
+        Args:
+            task_id: The task identifier
+            file_info: Bundle entry, either a dict with file_id/file_name or a bare file_id
+            task_folder: Folder where the file is saved
+            chunk_size: Bytes copied per read/write
+
+        Returns:
+            Dictionary describing the downloaded file, or None if it was skipped or failed
+        """
+        # Handle different response formats
+        if isinstance(file_info, dict):
+            # Dictionary format
+            file_id = file_info.get("file_id")
+            file_name = file_info.get("file_name", f"unknown_file_{file_id}")
+        elif isinstance(file_info, str):
+            # String format - might be the file_id directly
+            file_id = file_info
+            file_name = f"file_{file_id}"
+        else:
+            logger.warning(f"Unexpected file_info format: {file_info} (type: {type(file_info)})")
+            return None
+
+        if not file_id:
+            logger.warning(f"No file_id found in file_info: {file_info}")
+            return None
 
         try:
-            logger.info(f"Listing bundle files for task_id: {task_id}")
-            response = self._make_request("GET", f"bundle/{task_id}")
-            files = response.json()
-            logger.info(f"Bundle files response type for task_id {task_id}: {type(files)}")
-            logger.info(f"Bundle files response for task_id {task_id}: {files}")
+            # Save to task folder
+            file_path = os.path.join(task_folder, file_name)
+
+            # Bundle files never change once a task is done, and a file only gets its final
+            # name once it is complete, so one left by an earlier attempt is kept
+            expected_size = file_info.get("file_size") if isinstance(file_info, dict) else None
+            if os.path.exists(file_path) and (
+                not expected_size or os.path.getsize(file_path) == expected_size
+            ):
+                logger.debug("Already downloaded file: %s", file_name)
+                return {
+                    "file_name": file_name,
+                    "file_path": file_path,
+                    "file_id": file_id,
+                    "file_size": os.path.getsize(file_path),
+                }
 
-            # Log the structure if it's a dict
-            if isinstance(files, dict):
-                logger.info(f"Bundle response keys: {list(files.keys())}")
+            # The download goes to a .part file first. One cut short by an error was truncated
+            # to what arrived and is resumed; one at full size may be a preallocated file from
+            # a killed process with a zero-filled tail, so it is downloaded again from scratch
+            part_path = file_path + ".part"
+            existing_size = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+
+            # Ask for the raw bytes so the body can be copied straight to disk
+            headers = {"Accept-Encoding": "identity"}
+            if expected_size and 0 < existing_size < expected_size:
+                headers["Range"] = f"bytes={existing_size}-"
+
+            # Download the file using correct API endpoint. The read timeout applies between
+            # socket reads, so a stalled transfer fails instead of holding a worker forever
+            download_url = f"bundle/{task_id}/{file_id}"
+            download_response = self._make_request(
+                "GET", download_url, stream=True, headers=headers, timeout=(5, 300)
+            )
+            # Closing the response hands the connection back to the pool even if the copy fails
+            with download_response:
+                # 206 means the server honoured the range; a 200 carries the whole file
+                resume = download_response.status_code == 206
+
+                # Copy in large blocks from the socket to the file without a per-chunk Python
+                # loop. Decode only if the server compressed the body despite asking for
+                # identity; otherwise urllib3 hands the socket bytes straight through
+                download_response.raw.decode_content = (
+                    download_response.headers.get("Content-Encoding", "identity") != "identity"
+                )
+                content_length = int(download_response.headers.get("Content-Length") or 0)
+                with open(part_path, "r+b" if resume else "wb") as f:
+                    if resume:
+                        f.seek(existing_size)
+                    if content_length:
+                        _preallocate(f, f.tell() + content_length)
+                    try:
+                        shutil.copyfileobj(download_response.raw, f, length=chunk_size)
+                    finally:
+                        # Drop any preallocated tail so an interrupted file can be resumed
+                        f.truncate()
+            os.replace(part_path, file_path)
+            file_size = os.path.getsize(file_path)
+
+            logger.debug("Downloaded file: %s, size: %d bytes", file_name, file_size)
 
-            return {"status": "success", "files": files}
-        except Exception as e:
+            return {
+                "file_name": file_name,
+                "file_path": file_path,
+                "file_id": file_id,
+                "file_size": file_size,
+            }
+        except Exception as file_error:
             logger.error(
-                f"Error listing bundle files for task_id {task_id}: {str(e)}", exc_info=True
+                f"Error downloading file {file_name} (file_id: {file_id}): {str(file_error)}"
             )
-            return {"status": "error", "message": str(e)}
+            # The other files are still downloaded even if one fails
+            return None
 
-    def _download_task(self, task_id: str, output_path: str = None) -> Dict[str, Any]:
+    def _download_task(
+        self,
+        task_id: str,
+        output_path: str = None,
+        chunk_size: int = DOWNLOAD_CHUNK_SIZE,
+        task_status: Optional[Dict[str, Any]] = None,
+        max_workers: Optional[int] = None,
+    ) -> Dict[str, Any]:
         """
         Download all results from a completed AppEEARS task using the bundle API.
 
@@ -208,14 +734,13 @@ class AppEEARSTools:
             task_id: The task identifier
             output_path: Path where to save the downloaded files (will create a folder)
                         If None, uses the DOWNLOAD_PATH environment variable or /tmp
+            chunk_size: Bytes copied per read/write when saving each file (default: 1 MiB)
+            task_status: Task status the caller already fetched; skips the status request
+            max_workers: Files downloaded at once; defaults to APPEEARS_DOWNLOAD_CONCURRENCY (8)
 
         Returns:
             Dictionary with download status and folder information
         """
-        import logging
-
-        logger = logging.getLogger(__name__)
-
         # Use configured download path if output_path is not provided
         if output_path is None:
             output_path = os.getenv("DOWNLOAD_PATH", "/tmp")
@@ -225,10 +750,11 @@ class AppEEARSTools:
             logger.info(f"Starting download for task_id: {task_id}, output_path: {output_path}")
 
             # First check if task is complete
-            logger.info(f"Checking task status for task_id: {task_id}")
-            status_response = self._make_request("GET", f"task/{task_id}")
-            task_status = status_response.json()
-            logger.info(f"Task status response: {task_status}")
+            if task_status is None:
+                logger.info(f"Checking task status for task_id: {task_id}")
+                status_response = self._make_request("GET", f"task/{task_id}")
+                task_status = _json(status_response)
+                logger.debug("Task status response: %s", task_status)
 
             if task_status.get("status") != "done":
                 logger.error(f"Task {task_id} is not complete. Status: {task_status.get('status')}")
@@ -241,10 +767,10 @@ class AppEEARSTools:
 
             # List files in the bundle
             logger.info(f"Listing files in bundle for task_id: {task_id}")
-            bundle_response = self._make_request("GET", f"bundle/{task_id}")
-            bundle_files = bundle_response.json()
-            logger.info(f"Bundle files response type: {type(bundle_files)}")
-            logger.info(f"Bundle files response: {bundle_files}")
+            bundle_result = self._list_bundle_files(task_id)
+            if bundle_result["status"] != "success":
+                return {"status": "error", "message": f"Download error: {bundle_result['message']}"}
+            bundle_files = bundle_result["files"]
 
             # If bundle_files is not a list, try to extract files from the response
             if not isinstance(bundle_files, list):
@@ -253,10 +779,10 @@ class AppEEARSTools:
                     # Try to find files in the response
                     if "files" in bundle_files:
                         bundle_files = bundle_files["files"]
-                        logger.info(f"Extracted files from response: {bundle_files}")
+                        logger.debug("Extracted files from response: %s", bundle_files)
                     elif "data" in bundle_files:
                         bundle_files = bundle_files["data"]
-                        logger.info(f"Extracted data from response: {bundle_files}")
+                        logger.debug("Extracted data from response: %s", bundle_files)
                     else:
                         logger.error(f"Could not find files in bundle response: {bundle_files}")
                         return {
@@ -292,70 +818,19 @@ class AppEEARSTools:
             os.makedirs(task_folder, exist_ok=True)
             logger.info(f"Task folder created successfully: {task_folder}")
 
-            # Download all files in the bundle
-            downloaded_files = []
-            for i, file_info in enumerate(bundle_files):
-                logger.info(
-                    f"Processing file {i + 1}/{len(bundle_files)}: {file_info} (type: {type(file_info)})"
+            # Download the bundle files concurrently; each is an independent GET, so the
+            # wall-clock time is bounded by the slowest batch instead of the sum of all files
+            if max_workers is None:
+                max_workers = int(os.getenv("APPEEARS_DOWNLOAD_CONCURRENCY", "8"))
+            max_workers = max(1, min(max_workers, len(bundle_files)))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = executor.map(
+                    lambda file_info: self._download_one(
+                        task_id, file_info, task_folder, chunk_size
+                    ),
+                    bundle_files,
                 )
-
-                # Handle different response formats
-                if isinstance(file_info, dict):
-                    # Dictionary format
-                    file_id = file_info.get("file_id")
-                    file_name = file_info.get("file_name", f"unknown_file_{file_id}")
-                elif isinstance(file_info, str):
-                    # String format - might be the file_id directly
-                    file_id = file_info
-                    file_name = f"file_{file_id}"
-                else:
-                    logger.warning(
-                        f"Unexpected file_info format: {file_info} (type: {type(file_info)})"
-                    )
-                    continue
-
-                if not file_id:
-                    logger.warning(f"No file_id found in file_info: {file_info}")
-                    continue
-
-                logger.info(f"Downloading file_id: {file_id}, file_name: {file_name}")
-
-                try:
-                    # Download the file using correct API endpoint
-                    download_url = f"bundle/{task_id}/{file_id}"
-                    logger.info(f"Making download request to: {download_url}")
-                    download_response = self._make_request("GET", download_url, stream=True)
-                    logger.info(f"Download response status: {download_response.status_code}")
-
-                    # Save to task folder
-                    file_path = os.path.join(task_folder, file_name)
-                    logger.info(f"Saving file to: {file_path}")
-
-                    file_size = 0
-                    with open(file_path, "wb") as f:
-                        for chunk in download_response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                            file_size += len(chunk)
-
-                    logger.info(
-                        f"Successfully downloaded file: {file_name}, size: {file_size} bytes"
-                    )
-
-                    downloaded_files.append(
-                        {
-                            "file_name": file_name,
-                            "file_path": file_path,
-                            "file_id": file_id,
-                            "file_size": file_size,
-                        }
-                    )
-
-                except Exception as file_error:
-                    logger.error(
-                        f"Error downloading file {file_name} (file_id: {file_id}): {str(file_error)}"
-                    )
-                    # Continue with other files even if one fails
-                    continue
+                downloaded_files = [result for result in results if result is not None]
 
             if not downloaded_files:
                 logger.error(f"Failed to download any files for task_id: {task_id}")
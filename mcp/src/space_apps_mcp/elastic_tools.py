@@ -1,53 +1,581 @@
+import atexit
+import logging
 import os
-from typing import List, Dict, Any
+import threading
+import weakref
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Deque, List, Dict, Any, Iterable, Iterator, Optional, Set
+import orjson
+from cachetools import TTLCache
 from dotenv import load_dotenv
 from elasticsearch import Elasticsearch
+from elasticsearch.serializer import OrjsonSerializer
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger(__name__)
+
+# Client shared by every ElasticTools instance so they reuse one keep-alive connection pool
+_ES = Elasticsearch(
+    hosts=[f"http://{os.getenv('ELASTIC_HOST', 'localhost')}:{os.getenv('ELASTIC_PORT', '9200')}"],
+    basic_auth=(
+        os.getenv("ELASTIC_USERNAME", "elastic"),
+        os.getenv("ELASTIC_PASSWORD", ""),
+    ),
+    # Compresses request bodies and asks for gzip responses
+    http_compress=True,
+    request_timeout=60,
+    retry_on_timeout=True,
+    max_retries=3,
+    connections_per_node=32,
+    # Encode request bodies and decode search responses with orjson
+    serializer=OrjsonSerializer(),
+)
+
+# Index listings are reused for SPACE_APPS_MCP_CACHE_TTL seconds (0 disables caching);
+# ingesting clears them, since writing to a new index creates it
+_CACHE_TTL = float(os.getenv("SPACE_APPS_MCP_CACHE_TTL", "30"))
+_INDEX_CACHE: TTLCache = TTLCache(maxsize=1, ttl=_CACHE_TTL)
+_INDEX_CACHE_LOCK = threading.Lock()
+
+# Searches return at most this many hits, and only these parts of the response plus the parts
+# the request asks for (see _search_filter_path)
+_MAX_SEARCH_SIZE = 1000
+_SEARCH_FILTER_PATH = [
+    "took",
+    "hits.total",
+    "hits.max_score",
+    "hits.hits._index",
+    "hits.hits._id",
+    "hits.hits._score",
+    "hits.hits._source",
+]
+
+# Response parts returned only when the search body has the key they answer to
+_REQUESTED_RESPONSE_PATHS = {
+    "sort": ["hits.hits.sort"],
+    "search_after": ["hits.hits.sort"],
+    "highlight": ["hits.hits.highlight"],
+    "fields": ["hits.hits.fields"],
+    "docvalue_fields": ["hits.hits.fields"],
+    "script_fields": ["hits.hits.fields"],
+    "stored_fields": ["hits.hits.fields"],
+    "collapse": ["hits.hits.fields", "hits.hits.inner_hits"],
+    "inner_hits": ["hits.hits.inner_hits"],
+    "_name": ["hits.hits.matched_queries"],
+    "explain": ["hits.hits._explanation"],
+    "version": ["hits.hits._version"],
+    "seq_no_primary_term": ["hits.hits._seq_no", "hits.hits._primary_term"],
+    "aggs": ["aggregations"],
+    "aggregations": ["aggregations"],
+    "suggest": ["suggest"],
+    "pit": ["pit_id"],
+    "profile": ["profile"],
+}
+
+# Leaf queries that only match or don't; in filter context Elasticsearch can cache them
+_FILTER_CLAUSES = frozenset({"term", "terms", "range", "exists", "ids"})
+
+# Bulk requests carry at most this many documents or bytes, sent from this many threads
+_BULK_CHUNK_DOCS = int(os.getenv("ES_BULK_CHUNK", "1000"))
+_BULK_CHUNK_BYTES = 10 * 1024 * 1024
+_BULK_THREADS = int(os.getenv("ES_BULK_THREADS", "4"))
+
+
+def _ndjson_chunks(index: str, documents: Iterable[Dict[str, Any]]) -> Iterator[bytes]:
+    """Serialize documents with orjson into size-bounded NDJSON _bulk bodies."""
+    action = orjson.dumps({"index": {"_index": index}}) + b"\n"
+    lines: List[bytes] = []
+    size = 0
+    for doc in documents:
+        line = action + orjson.dumps(doc) + b"\n"
+        if lines and (len(lines) >= _BULK_CHUNK_DOCS or size + len(line) > _BULK_CHUNK_BYTES):
+            yield b"".join(lines)
+            lines = []
+            size = 0
+        lines.append(line)
+        size += len(line)
+    if lines:
+        yield b"".join(lines)
+
+
+def _body_keys(body: Any, keys: set) -> None:
+    """Collect every key used anywhere in a search body, e.g. inner_hits inside a nested query."""
+    if isinstance(body, dict):
+        keys.update(body)
+        for value in body.values():
+            _body_keys(value, keys)
+    elif isinstance(body, list):
+        for item in body:
+            _body_keys(item, keys)
+
+
+def _search_filter_path(body: Dict[str, Any]) -> List[str]:
+    """The filter_path for a search: the usual hit fields plus whatever the body asks for."""
+    keys: set = set()
+    _body_keys(body, keys)
+    paths = list(_SEARCH_FILTER_PATH)
+    for key in keys & _REQUESTED_RESPONSE_PATHS.keys():
+        paths.extend(_REQUESTED_RESPONSE_PATHS[key])
+    return sorted(set(paths))
+
+
+def _is_filter_clause(clause: Any) -> bool:
+    """Whether a query clause matches without scoring and carries no boost."""
+    if not isinstance(clause, dict) or len(clause) != 1:
+        return False
+    kind, body = next(iter(clause.items()))
+    if kind not in _FILTER_CLAUSES or not isinstance(body, dict) or "boost" in body:
+        return False
+    return not any(isinstance(value, dict) and "boost" in value for value in body.values())
+
+
+def _uses_score(body: Any) -> bool:
+    """Whether _score is read anywhere in part of a search body: top_hits, a sort, a script."""
+    if isinstance(body, dict):
+        if "top_hits" in body or "_score" in body:
+            return True
+        return any(_uses_score(value) for value in body.values())
+    if isinstance(body, list):
+        return any(_uses_score(item) for item in body)
+    return isinstance(body, str) and "_score" in body
+
+
+def _scores_unused(body: Dict[str, Any]) -> bool:
+    """Whether a search's results don't depend on _score: no hits or aggs rank by it."""
+    if body.get("min_score") is not None or "rescore" in body:
+        return False
+    # top_hits and aggs ordered by max(_score) rank buckets by score even with size 0
+    if _uses_score(body.get("aggs")) or _uses_score(body.get("aggregations")):
+        return False
+    if body.get("size") == 0:
+        return True
+    sort = body.get("sort")
+    if not sort or body.get("track_scores"):
+        return False
+    items = sort if isinstance(sort, list) else [sort]
+    return not any(
+        item == "_score" or (isinstance(item, dict) and "_score" in item) for item in items
+    )
+
+
+def _promote_to_filter_context(query: Any, hints: List[str], apply: bool = True) -> Any:
+    """
+    Move non-scoring must clauses of bool queries, at any depth, into filter context.
+
+    Filter clauses are cached per shard and skip scoring, so repeated searches get cheaper. A
+    term or range clause in must still adds to _score, though, so callers only apply the move
+    when scores can't matter; with apply=False the query is left alone and each move that
+    could be made is only described in hints.
+    """
+    if not isinstance(query, dict) or not isinstance(query.get("bool"), dict):
+        return query
+    bool_query = dict(query["bool"])
+    for occur in ("must", "filter", "should", "must_not"):
+        clauses = bool_query.get(occur)
+        if isinstance(clauses, dict):
+            clauses = [clauses]
+        if isinstance(clauses, list):
+            bool_query[occur] = [_promote_to_filter_context(c, hints, apply) for c in clauses]
+
+    must = bool_query.get("must", [])
+    promoted = [clause for clause in must if _is_filter_clause(clause)]
+    if not promoted:
+        return {**query, "bool": bool_query}
+    kinds = ", ".join(sorted({next(iter(clause)) for clause in promoted}))
+    if not apply:
+        hints.append(
+            f"{len(promoted)} {kinds} clause(s) in bool.must could move to bool.filter and be"
+            " cached if their contribution to _score isn't needed"
+        )
+        return query
+    bool_query["must"] = [clause for clause in must if not _is_filter_clause(clause)]
+    if not bool_query["must"]:
+        del bool_query["must"]
+    bool_query["filter"] = bool_query.get("filter", []) + promoted
+    hints.append(f"moved {len(promoted)} {kinds} clause(s) from bool.must to bool.filter")
+    return {**query, "bool": bool_query}
+
+
+# Queries whose results Elasticsearch won't cache, and why
+_UNCACHEABLE_QUERIES = {
+    "script": "script queries are not cached",
+    "script_score": "script_score computes a score per document",
+    "function_score": "function_score computes a score per document",
+    "geo_distance": "geo_distance queries are rarely reused and seldom cached",
+    "more_like_this": "more_like_this depends on the input documents",
+}
+
+
+def _cache_blockers(query: Any, reasons: List[str]) -> None:
+    """Collect the reasons query can't be served from the query or request cache."""
+    if isinstance(query, dict):
+        for key, value in query.items():
+            if key in _UNCACHEABLE_QUERIES:
+                reasons.append(_UNCACHEABLE_QUERIES[key])
+            elif (
+                key == "range"
+                and isinstance(value, dict)
+                and any(
+                    isinstance(bound, str) and bound.startswith("now")
+                    for bounds in value.values()
+                    if isinstance(bounds, dict)
+                    for bound in bounds.values()
+                )
+            ):
+                reasons.append("range uses 'now', which changes on every request")
+            _cache_blockers(value, reasons)
+    elif isinstance(query, list):
+        for item in query:
+            _cache_blockers(item, reasons)
+
+
+def _scores(query: Any) -> bool:
+    """Whether query computes relevance scores outside of filter context."""
+    if not isinstance(query, dict) or not query:
+        return False
+    if "constant_score" in query or _is_filter_clause(query) or "match_all" in query:
+        return False
+    bool_query = query.get("bool")
+    if isinstance(bool_query, dict):
+        return bool(bool_query.get("must") or bool_query.get("should"))
+    return True
+
+
+def _profile_summary(profile: Dict[str, Any], query: Any) -> Dict[str, Any]:
+    """
+    Roll a search profile up into per-phase and per-query-type timings.
+
+    Also reports whether the query could be served from cache, and what prevents it if not.
+    """
+    phases: Dict[str, int] = defaultdict(int)
+    query_types: Dict[str, int] = defaultdict(int)
+
+    def walk(node: Dict[str, Any]) -> None:
+        query_types[node.get("type", "unknown")] += node.get("time_in_nanos", 0)
+        for phase, nanos in node.get("breakdown", {}).items():
+            if not phase.endswith("_count"):
+                phases[phase] += nanos
+        for child in node.get("children", []):
+            walk(child)
+
+    shards = profile.get("shards", [])
+    for shard in shards:
+        for search in shard.get("searches", []):
+            for node in search.get("query", []):
+                walk(node)
+
+    reasons: List[str] = []
+    _cache_blockers(query, reasons)
+    if _scores(query):
+        reasons.append("the query scores documents; only filter context clauses are cached")
+    return {
+        "shards": len(shards),
+        "phases_ms": {phase: round(nanos / 1e6, 3) for phase, nanos in phases.items() if nanos},
+        "query_types_ms": {kind: round(nanos / 1e6, 3) for kind, nanos in query_types.items()},
+        "cache_eligible": not reasons,
+        "cache_blockers": list(dict.fromkeys(reasons)),
+    }
+
+
+# Queued single documents are sent as one bulk request per index once this many documents
+# or bytes are waiting, or this many seconds after the first one was queued
+_INGEST_BATCH_DOCS = 500
+_INGEST_BATCH_BYTES = int(os.getenv("ES_BULK_BATCH_BYTES", str(5 * 1024 * 1024)))
+_INGEST_FLUSH_SEC = float(os.getenv("ES_BULK_FLUSH_SEC", "1"))
+
+
+class _IngestBuffer:
+    """Collect single-document ingests per index and send them as bulk requests."""
+
+    def __init__(
+        self,
+        send: Callable[[str, List[Dict[str, Any]]], Dict[str, Any]],
+        refresh: Callable[[List[str]], Dict[str, Any]],
+        max_docs: int = _INGEST_BATCH_DOCS,
+        max_bytes: int = _INGEST_BATCH_BYTES,
+        flush_interval: float = _INGEST_FLUSH_SEC,
+    ):
+        self._send = send
+        self._refresh = refresh
+        self._max_docs = max_docs
+        self._max_bytes = max_bytes
+        self._flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._docs: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._bytes: Dict[str, int] = defaultdict(int)
+        self._timer: Optional[threading.Timer] = None
+        # Sends running outside the lock, which flush() waits for before it reports
+        self._sending = 0
+        self._idle = threading.Condition(self._lock)
+        # Indices written to since the last flush(), which it refreshes for search
+        self._unrefreshed: Set[str] = set()
+        # Results of timed flushes that failed, until flush() reports them
+        self._failures: Deque[Dict[str, Any]] = deque(maxlen=100)
+
+    def add(self, index: str, document: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a document, sending its index's batch right away if the batch is full."""
+        # The serialized size is what counts against the bulk request size
+        size = len(orjson.dumps(document))
+        with self._lock:
+            docs = self._docs[index]
+            docs.append(document)
+            self._bytes[index] += size
+            buffered = len(docs)
+            batch = None
+            if buffered >= self._max_docs or self._bytes[index] >= self._max_bytes:
+                batch = self._take(index)
+                self._sending += 1
+            elif self._timer is None:
+                self._timer = threading.Timer(self._flush_interval, self._flush_on_timer)
+                self._timer.daemon = True
+                self._timer.start()
+
+        if batch is not None:
+            try:
+                result = self._send(index, batch)
+            finally:
+                self._done_sending()
+            return {"status": result["status"], "queued": False, "flushed": result}
+        return {"status": "success", "queued": True, "buffered": buffered}
+
+    def flush(self) -> Dict[str, Any]:
+        """
+        Send every queued document now and refresh the indices written to, so they are
+        searchable on return. Waits for background sends still running, and reports any
+        earlier one that failed.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            # A timed flush may have taken documents and still be sending them; wait so its
+            # documents are indexed (or requeued and sent below) before reporting success
+            while self._sending:
+                self._idle.wait()
+            batches = {index: self._take(index) for index in list(self._docs)}
+            earlier = list(self._failures)
+            self._failures.clear()
+            indices = sorted(self._unrefreshed | set(batches))
+            self._unrefreshed.clear()
+
+        results = {index: self._send(index, docs) for index, docs in batches.items()}
+        failed = [index for index, result in results.items() if result["status"] != "success"]
+        response = {"status": "partial" if failed or earlier else "success", "indices": results}
+        if earlier:
+            response["earlier_failures"] = earlier
+        if indices:
+            refreshed = self._refresh(indices)
+            if refreshed["status"] != "success":
+                response["status"] = "partial"
+                response["refresh"] = refreshed
+        return response
+
+    def _take(self, index: str) -> List[Dict[str, Any]]:
+        self._unrefreshed.add(index)
+        self._bytes.pop(index, None)
+        return self._docs.pop(index)
+
+    def _done_sending(self) -> None:
+        with self._lock:
+            self._sending -= 1
+            if not self._sending:
+                self._idle.notify_all()
+
+    def _requeue(self, index: str, documents: List[Dict[str, Any]]) -> None:
+        """Put a batch whose bulk request failed back in front of the index's queue."""
+        size = sum(len(orjson.dumps(document)) for document in documents)
+        with self._lock:
+            self._docs[index][:0] = documents
+            self._bytes[index] += size
+
+    def _flush_on_timer(self) -> None:
+        with self._lock:
+            self._timer = None
+            batches = {index: self._take(index) for index in list(self._docs)}
+            self._sending += 1
+
+        # Nobody is waiting on a timed flush, so failures are kept for the next flush() to
+        # report. A batch whose whole request failed goes back in the queue to be sent again;
+        # one with per-document errors can't be resent without duplicating the rest.
+        try:
+            for index, docs in batches.items():
+                result = self._send(index, docs)
+                if result["status"] == "success":
+                    continue
+                logger.error(
+                    "Flushing %d queued documents to %s failed: %s", len(docs), index, result
+                )
+                requeued = result["status"] == "error"
+                if requeued:
+                    self._requeue(index, docs)
+                with self._lock:
+                    self._failures.append({"index": index, "requeued": requeued, **result})
+        finally:
+            self._done_sending()
+
+
+# Don't lose documents still waiting in a buffer when the server stops
+_INGEST_BUFFERS: "weakref.WeakSet[_IngestBuffer]" = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_ingest_buffers() -> None:
+    for buffer in list(_INGEST_BUFFERS):
+        buffer.flush()
+
 
 class ElasticTools:
     def __init__(self):
-        self.es = Elasticsearch(
-            hosts=[
-                f"http://{os.getenv('ELASTIC_HOST', 'localhost')}:{os.getenv('ELASTIC_PORT', '9200')}"
-            ],
-            basic_auth=(
-                os.getenv("ELASTIC_USERNAME", "elastic"),
-                os.getenv("ELASTIC_PASSWORD", ""),
-            ),
-        )
+        self.es = _ES
+        self._ingest_buffer = _IngestBuffer(self._bulk_ingest, self._refresh_indices)
+        _INGEST_BUFFERS.add(self._ingest_buffer)
 
     def _list_indices(self) -> Dict[str, Any]:
         """List all Elastic indices"""
+        with _INDEX_CACHE_LOCK:
+            cached = _INDEX_CACHE.get("indices")
+        if cached is not None:
+            return cached
         try:
-            indices = self.es.indices.get_alias().keys()
-            return {"status": "success", "indices": list(indices)}
+            # _cat/indices returns just the names, not every index's alias metadata
+            rows = self.es.cat.indices(h="index", format="json")
+            result = {"status": "success", "indices": [row["index"] for row in rows]}
         except Exception as e:
             return {"status": "error", "message": str(e)}
+        with _INDEX_CACHE_LOCK:
+            _INDEX_CACHE["indices"] = result
+        return result
 
-    def _search_index(self, index: str, query: Dict[str, Any]) -> Dict[str, Any]:
-        """Search an Elastic index with a query"""
+    def _forget_indices(self) -> None:
+        """Drop the cached index list after a write that may have created an index."""
+        with _INDEX_CACHE_LOCK:
+            _INDEX_CACHE.clear()
+
+    def _search_index(
+        self,
+        index: str,
+        query: Dict[str, Any],
+        includes: Optional[List[str]] = None,
+        size: int = 10,
+        profile: bool = False,
+    ) -> Dict[str, Any]:
+        """Search an Elastic index with a query, optionally with a timing summary"""
+        body = dict(query)
+        body.setdefault("size", size)
+        if body["size"] > _MAX_SEARCH_SIZE:
+            return {
+                "status": "error",
+                "message": f"size must be at most {_MAX_SEARCH_SIZE}, got {body['size']}",
+            }
+        if includes:
+            body["_source"] = {"includes": includes}
+
+        cache_hints: List[str] = []
+        if "query" in body:
+            # Moving clauses out of must changes _score, so only when hits aren't ranked by it
+            body["query"] = _promote_to_filter_context(
+                body["query"], cache_hints, apply=_scores_unused(body)
+            )
+        # Aggregation-only searches can be answered from the shard request cache
+        request_cache = None
+        if body["size"] == 0 and ("aggs" in body or "aggregations" in body):
+            request_cache = True
+            cache_hints.append("size 0 aggregation search uses the shard request cache")
         try:
-            result = self.es.search(index=index, body=query)
-            return {"status": "success", "results": result}
+            if profile:
+                body["profile"] = True
+            # Only the parts of the response the tools use or the body asks for are sent back.
+            # .body unwraps the client's response object, which orjson can't serialize
+            result = self.es.search(
+                index=index,
+                body=body,
+                filter_path=_search_filter_path(body),
+                request_cache=request_cache,
+            ).body
+            response = {"status": "success", "results": result, "cache_hints": cache_hints}
+            if profile:
+                # The raw profile is far too large to hand back; only the summary is returned
+                response["profile"] = _profile_summary(result.pop("profile", {}), body.get("query"))
+            return response
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
-    def _ingest_document(self, index: str, document: Dict[str, Any]) -> Dict[str, Any]:
-        """Ingest a single document into Elastic"""
+    def _msearch(self, searches: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Run several searches in one _msearch request"""
         try:
-            result = self.es.index(index=index, document=document)
-            return {"status": "success", "result": result}
+            # Each search is a header line naming the index followed by its query line
+            body = b"".join(
+                orjson.dumps({"index": search["index"]})
+                + b"\n"
+                + orjson.dumps(search.get("query", {}))
+                + b"\n"
+                for search in searches
+            )
+            result = self.es.msearch(searches=body)
+            # Responses come back in the order the searches were sent; a failed search
+            # carries its own error instead of failing the others
+            return {"status": "success", "responses": result["responses"]}
+        except Exception as e:
+            return {"status": "error", "message": str(e)}
+
+    def _queue_document(self, index: str, document: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a single document to be sent with others in one bulk request"""
+        return self._ingest_buffer.add(index, document)
+
+    def _flush_ingest(self) -> Dict[str, Any]:
+        """Send all queued documents to Elastic now"""
+        return self._ingest_buffer.flush()
+
+    def _refresh_indices(self, indices: List[str]) -> Dict[str, Any]:
+        """Make recently ingested documents in the given indices visible to search"""
+        try:
+            self.es.indices.refresh(index=",".join(indices))
+            return {"status": "success", "indices": indices}
         except Exception as e:
             return {"status": "error", "message": str(e)}
 
     def _bulk_ingest(self, index: str, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Bulk ingest documents into Elastic"""
         try:
-            actions = [{"_index": index, "_source": doc} for doc in documents]
-            result = self.es.bulk(operations=actions)
-            return {"status": "success", "result": result}
+            # Large chunks can take a while to index; give them longer than regular calls
+            es = self.es.options(request_timeout=120)
+
+            def send(chunk: bytes) -> Dict[str, Any]:
+                # The body is already NDJSON, so the client sends it without re-serializing
+                return es.bulk(operations=chunk)
+
+            indexed = 0
+            errors = []
+
+            def count(response: Dict[str, Any]) -> None:
+                nonlocal indexed
+                for item in response["items"]:
+                    result = item["index"]
+                    if "error" in result:
+                        errors.append(result)
+                    else:
+                        indexed += 1
+
+            # executor.map would serialize every chunk up front; keeping only a couple of
+            # chunks per thread in flight bounds memory to a few request bodies
+            in_flight: deque = deque()
+            with ThreadPoolExecutor(max_workers=_BULK_THREADS) as executor:
+                for chunk in _ndjson_chunks(index, documents):
+                    if len(in_flight) >= 2 * _BULK_THREADS:
+                        count(in_flight.popleft().result())
+                    in_flight.append(executor.submit(send, chunk))
+                while in_flight:
+                    count(in_flight.popleft().result())
+            self._forget_indices()
+            # Only counts are returned; per-document responses would echo the whole batch
+            return {
+                "status": "partial" if errors else "success",
+                "indexed": indexed,
+                "failed": len(errors),
+                "errors": errors[:10],
+            }
         except Exception as e:
             return {"status": "error", "message": str(e)}
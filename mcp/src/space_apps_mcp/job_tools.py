@@ -5,16 +5,291 @@ These tools use the AppEEARS API as the source of truth for job management.
 
 import os
 import logging
-from typing import Dict, Any, List, Optional
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Any, List, Optional
 from datetime import datetime
+import ijson
+from cachetools import LFUCache, TTLCache
 import requests
 
-from .appeears_tools import AppEEARSTools
+from .appeears_tools import (
+    AppEEARSTools,
+    _FINISHED_TASK_STATES,
+    _iso_to_appeears,
+    _json,
+    _parse_iso_datetime,
+)
 
 logger = logging.getLogger(__name__)
 
 # Initialize AppEEARS tools
-appears_tools = AppEEARSTools()
+appears_tools = AppEEARSTools.instance()
+
+# Map API status to our internal status
+_STATUS_MAP = {
+    "pending": "pending",
+    "running": "running",
+    "done": "completed",
+    "failed": "failed",
+    "cancelled": "cancelled",
+}
+
+# Status results are reused for a couple of seconds so polling and chained tool calls
+# don't each hit the API
+_STATUS_TTL = 2.0
+_status_cache: TTLCache = TTLCache(maxsize=256, ttl=_STATUS_TTL)
+# Guards both status caches; cachetools caches update their bookkeeping on reads too
+_status_cache_lock = threading.Lock()
+
+# Terminal states never change, so those results are kept until the least used ones are
+# evicted, which bounds memory on long-running servers
+_TERMINAL_JOB_STATES = frozenset({"completed", "failed", "cancelled"})
+_terminal_cache: LFUCache = LFUCache(maxsize=1024)
+
+# Jobs in a terminal state can't be cancelled any more
+_UNCANCELLABLE = _TERMINAL_JOB_STATES
+
+
+# How long recently completed jobs took, used to space out wait_for_job's polls
+_duration_samples: Deque[float] = deque(maxlen=200)
+
+# Keys AppEEARS requires on every requested layer and location
+_LAYER_KEYS = frozenset({"layer", "product"})
+_LOCATION_KEYS = frozenset({"id", "category", "latitude", "longitude"})
+
+# Submissions only echo the requested layers and locations back when asked to;
+# the caller already has them and large requests would double the response size
+_ECHO_PARAMS = os.getenv("APPEARS_ECHO_PARAMS", "0") == "1"
+
+# Job listings are reused for a few seconds so repeated listing doesn't refetch every job;
+# submitting a job clears them so it shows up immediately
+_LIST_TTL = float(os.getenv("APPEARS_LIST_TTL", "5"))
+# Each (limit, offset) page is its own entry, so the cache is bounded like the status caches
+_list_cache: TTLCache = TTLCache(maxsize=64, ttl=_LIST_TTL)
+
+# Job listings with a body at least this large (or of unknown size) are stream-parsed
+_STREAM_LIST_BYTES = 1 << 20
+
+
+def _cached_status(key: Any) -> Optional[Dict[str, Any]]:
+    """Return a cached status result for key if it hasn't expired yet."""
+    with _status_cache_lock:
+        result = _terminal_cache.get(key)
+        if result is None:
+            result = _status_cache.get(key)
+    return result
+
+
+def _cache_status(key: Any, result: Dict[str, Any]) -> bool:
+    """Cache a status result; True if it is the first terminal result cached for key."""
+    with _status_cache_lock:
+        if result["job_status"] in _TERMINAL_JOB_STATES:
+            first = key not in _terminal_cache
+            _terminal_cache[key] = result
+            _status_cache.pop(key, None)
+            return first
+        _status_cache[key] = result
+        return False
+
+
+def invalidate(job_id: str) -> None:
+    """Drop the cached status of a job."""
+    with _status_cache_lock:
+        _terminal_cache.pop(job_id, None)
+        _status_cache.pop(job_id, None)
+
+
+def _format_task(job_id: str, task_status: Dict[str, Any]) -> Dict[str, Any]:
+    """Format an AppEEARS task status into every field the job tools report."""
+    api_status = task_status.get("status", "unknown")
+    job_status = _STATUS_MAP.get(api_status.lower(), "pending")
+
+    # Parse the creation time once per fetch; the elapsed time is derived from it when read,
+    # so a cached status still reports an up-to-date value
+    created_time = None
+    created = task_status.get("created")
+    if created:
+        try:
+            created_time = _parse_iso_datetime(created)
+        except (ValueError, TypeError):
+            pass
+
+    return {
+        "status": "success",
+        "job_id": job_id,
+        "job_status": job_status,
+        "api_status": api_status,
+        "_created_dt": created_time,
+        "task_name": task_status.get("task_name"),
+        "created": task_status.get("created"),
+        "updated": task_status.get("updated"),
+        "progress": task_status.get("progress"),
+        "message": task_status.get("message"),
+        "task_type": task_status.get("task_type"),
+        "parameters": task_status.get("params"),
+        "download_url": task_status.get("download_url"),
+        "full_response": task_status,
+    }
+
+
+def _format_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Format one entry of the AppEEARS task list."""
+    api_status = job.get("status") or "unknown"
+    return {
+        "job_id": job.get("task_id"),
+        "task_name": job.get("task_name"),
+        "status": _STATUS_MAP.get(api_status.lower(), "pending"),
+        "api_status": api_status,
+        "created": job.get("created"),
+        "updated": job.get("updated"),
+        "progress": job.get("progress"),
+        "message": job.get("message"),
+    }
+
+
+def _elapsed_time(task: Dict[str, Any]) -> Optional[float]:
+    """Seconds since a formatted task was created, or None if that isn't known."""
+    created_time = task["_created_dt"]
+    if created_time is None:
+        return None
+    return (datetime.now(created_time.tzinfo) - created_time).total_seconds()
+
+
+def _fetch_task(job_id: str) -> Dict[str, Any]:
+    """Get the formatted status of a job, from the cache while it is still fresh."""
+    cached = _cached_status(job_id)
+    if cached is not None:
+        return cached
+    result = appears_tools._get_task_status(job_id)
+    if result["status"] != "success":
+        return result
+    task = _format_task(job_id, result["task_status"])
+    # Checked and cached under one lock, so concurrent polls record a completed job only once
+    if _cache_status(job_id, task) and task["job_status"] == "completed":
+        _record_duration(task)
+    return task
+
+
+def _record_duration(task: Dict[str, Any]) -> None:
+    """Remember how long a completed job ran, from its created and updated timestamps."""
+    created_time = task["_created_dt"]
+    if created_time is None or not task["updated"]:
+        return
+    try:
+        updated_time = _parse_iso_datetime(task["updated"])
+    except (ValueError, TypeError):
+        return
+    duration = (updated_time - created_time).total_seconds()
+    if duration > 0:
+        _duration_samples.append(duration)
+
+
+def _poll_schedule(max_wait: float, poll_budget: int) -> List[float]:
+    """
+    Job ages in seconds at which to poll, spaced geometrically up to the expected duration.
+
+    Job durations are right-skewed, so polls are dense early, when most jobs finish, and
+    sparse later. The last poll lands on the 99th percentile of recent durations, or on
+    max_wait until enough jobs have been seen.
+    """
+    horizon = max_wait
+    if len(_duration_samples) >= 5:
+        samples = sorted(_duration_samples)
+        horizon = min(max_wait, samples[int(0.99 * (len(samples) - 1))])
+    first = 5.0
+    if poll_budget <= 1 or horizon <= first:
+        return [horizon]
+    ratio = (horizon / first) ** (1 / (poll_budget - 1))
+    return [first * ratio**i for i in range(poll_budget)]
+
+
+def wait_for_job(job_id: str, max_wait: float = 3600, poll_budget: int = 30) -> Dict[str, Any]:
+    """
+    Wait for an AppEEARS job to finish, polling on an adaptive schedule.
+
+    Polls follow _poll_schedule based on how long recent jobs took; once the schedule is
+    used up the job is checked once a minute until max_wait.
+
+    Args:
+        job_id: The job identifier
+        max_wait: Maximum number of seconds to wait
+        poll_budget: Number of polls spread over the expected job duration
+
+    Returns:
+        Dictionary with the final job status, or an error if the wait timed out
+    """
+    logger.info(f"wait_for_job called with job_id: {job_id}, max_wait: {max_wait}")
+    start = time.monotonic()
+    deadline = start + max_wait
+    status_result = check_job_status(job_id)
+    if status_result["status"] != "success":
+        return status_result
+
+    # The schedule is in job ages, so a job that has already been running skips ahead
+    start_age = status_result["elapsed_time"] or 0.0
+    schedule = iter([age for age in _poll_schedule(max_wait, poll_budget) if age > start_age])
+    while (
+        status_result["job_status"] not in _TERMINAL_JOB_STATES
+        and status_result["api_status"].lower() not in _FINISHED_TASK_STATES
+    ):
+        now = time.monotonic()
+        if now >= deadline:
+            return {
+                "status": "error",
+                "message": f"Timed out after {max_wait} seconds waiting for job {job_id}",
+                "job_id": job_id,
+                "job_status": status_result["job_status"],
+            }
+        age = next(schedule, None)
+        delay = 60.0 if age is None else start + (age - start_age) - now
+        time.sleep(min(max(delay, 0.0), deadline - now))
+        status_result = check_job_status(job_id)
+        if status_result["status"] != "success":
+            return status_result
+
+    logger.info(f"wait_for_job finished - job_id: {job_id}, status: {status_result['job_status']}")
+    return status_result
+
+
+def _not_completed_error(job_id: str) -> Optional[Dict[str, Any]]:
+    """Explain a failed bundle request with the job's status if it hasn't completed yet."""
+    status_result = check_job_status(job_id)
+    if status_result["status"] == "success" and status_result["job_status"] != "completed":
+        return {
+            "status": "error",
+            "message": f"Job {job_id} is not completed (current status: {status_result['job_status']})",
+        }
+    return None
+
+
+def _validate_submission(
+    layers: List[Dict[str, str]],
+    locations: List[Dict[str, Any]],
+    start_date: str,
+    end_date: str,
+) -> Optional[str]:
+    """Return why a submission would be rejected by AppEEARS, or None if it looks valid."""
+    if not layers or not locations:
+        return "layers and locations must be non-empty"
+
+    bad_layers = [i for i, layer in enumerate(layers) if not _LAYER_KEYS.issubset(layer)]
+    if bad_layers:
+        return f"layers at positions {bad_layers} must have keys {sorted(_LAYER_KEYS)}"
+    bad_locations = [i for i, loc in enumerate(locations) if not _LOCATION_KEYS.issubset(loc)]
+    if bad_locations:
+        return f"locations at positions {bad_locations} must have keys {sorted(_LOCATION_KEYS)}"
+
+    try:
+        _iso_to_appeears(start_date)
+        _iso_to_appeears(end_date)
+    except ValueError:
+        return f"dates must be in YYYY-MM-DD format, got {start_date!r} and {end_date!r}"
+    # Valid YYYY-MM-DD strings sort in date order
+    if start_date > end_date:
+        return f"start_date {start_date} is after end_date {end_date}"
+    return None
 
 
 def submit_appears_job(
@@ -40,6 +315,12 @@ def submit_appears_job(
     logger.info(
         f"submit_appears_job called with task_name: {task_name}, start_date: {start_date}, end_date: {end_date}"
     )
+    # Reject requests AppEEARS would refuse anyway without spending an API call on them
+    invalid = _validate_submission(layers, locations, start_date, end_date)
+    if invalid is not None:
+        logger.error(f"submit_appears_job rejected: {invalid}")
+        return {"status": "error", "message": f"Invalid AppEEARS job: {invalid}"}
+
     try:
         # Submit the job using existing AppEEARS tools
         result = appears_tools._submit_point_request(
@@ -53,17 +334,23 @@ def submit_appears_job(
         if result["status"] == "success":
             job_id = result["task_id"]
             logger.info(f"submit_appears_job succeeded - job_id: {job_id}")
+            with _status_cache_lock:
+                _list_cache.clear()
 
-            return {
+            submit_result = {
                 "status": "success",
                 "job_id": job_id,
                 "message": f"AppEEARS job submitted successfully. Job ID: {job_id}",
                 "task_name": task_name,
-                "layers": layers,
-                "locations": locations,
+                "layer_count": len(layers),
+                "location_count": len(locations),
                 "start_date": start_date,
                 "end_date": end_date,
             }
+            if _ECHO_PARAMS:
+                submit_result["layers"] = layers
+                submit_result["locations"] = locations
+            return submit_result
         else:
             logger.error(f"submit_appears_job failed: {result['message']}")
             return {
@@ -89,59 +376,31 @@ def check_job_status(job_id: str) -> Dict[str, Any]:
     logger.info(f"check_job_status called with job_id: {job_id}")
     try:
         # Get status directly from AppEEARS API
-        result = appears_tools._get_task_status(job_id)
-
-        if result["status"] == "success":
-            task_status = result["task_status"]
-            api_status = task_status.get("status", "unknown")
-
-            # Map API status to our internal status
-            status_mapping = {
-                "pending": "pending",
-                "running": "running",
-                "done": "completed",
-                "failed": "failed",
-                "cancelled": "cancelled",
-            }
-
-            job_status = status_mapping.get(api_status.lower(), "pending")
-
-            # Calculate elapsed time if we have creation time
-            elapsed_time = None
-            if "created" in task_status:
-                try:
-                    created_time = datetime.fromisoformat(
-                        task_status["created"].replace("Z", "+00:00")
-                    )
-                    elapsed_time = (
-                        datetime.now(created_time.tzinfo) - created_time
-                    ).total_seconds()
-                except:
-                    pass
+        task = _fetch_task(job_id)
 
+        if task["status"] == "success":
             logger.info(
-                f"check_job_status succeeded - job_id: {job_id}, status: {job_status}, api_status: {api_status}"
+                f"check_job_status succeeded - job_id: {job_id}, status: {task['job_status']}, api_status: {task['api_status']}"
             )
-
             return {
                 "status": "success",
                 "job_id": job_id,
-                "job_status": job_status,
-                "api_status": api_status,
-                "elapsed_time": elapsed_time,
+                "job_status": task["job_status"],
+                "api_status": task["api_status"],
+                "elapsed_time": _elapsed_time(task),
                 "task_info": {
-                    "task_name": task_status.get("task_name"),
-                    "created": task_status.get("created"),
-                    "updated": task_status.get("updated"),
-                    "progress": task_status.get("progress"),
-                    "message": task_status.get("message"),
+                    "task_name": task["task_name"],
+                    "created": task["created"],
+                    "updated": task["updated"],
+                    "progress": task["progress"],
+                    "message": task["message"],
                 },
             }
         else:
-            logger.error(f"check_job_status failed - job_id: {job_id}, error: {result['message']}")
+            logger.error(f"check_job_status failed - job_id: {job_id}, error: {task['message']}")
             return {
                 "status": "error",
-                "message": f"Failed to check job status: {result['message']}",
+                "message": f"Failed to check job status: {task['message']}",
                 "job_id": job_id,
             }
 
@@ -150,7 +409,9 @@ def check_job_status(job_id: str) -> Dict[str, Any]:
         return {"status": "error", "message": f"Error checking job status: {str(e)}"}
 
 
-def download_job_results(job_id: str, output_path: str = None) -> Dict[str, Any]:
+def download_job_results(
+    job_id: str, output_path: str = None, max_workers: Optional[int] = None
+) -> Dict[str, Any]:
     """
     Download all results for a completed AppEEARS job using the Bundle API.
 
@@ -169,6 +430,8 @@ def download_job_results(job_id: str, output_path: str = None) -> Dict[str, Any]
         job_id: The job identifier
         output_path: Path where to save the results (will create a folder named task_{job_id})
                   If None, uses the DOWNLOAD_PATH environment variable or /tmp
+        max_workers: Number of files downloaded in parallel
+                  If None, uses the APPEEARS_DOWNLOAD_CONCURRENCY environment variable or 8
 
     Returns:
         Dictionary with download status and folder information including all downloaded files
@@ -180,23 +443,15 @@ def download_job_results(job_id: str, output_path: str = None) -> Dict[str, Any]
 
     logger.info(f"download_job_results called with job_id: {job_id}, output_path: {output_path}")
     try:
-        # First check if job is completed
-        status_result = check_job_status(job_id)
-        if status_result["status"] != "success":
-            return {
-                "status": "error",
-                "message": f"Could not check job status: {status_result['message']}",
-            }
-
-        if status_result["job_status"] != "completed":
-            return {
-                "status": "error",
-                "message": f"Job {job_id} is not completed (current status: {status_result['job_status']})",
-            }
-
-        # Download the results
+        # Download the results straight away; the bundle only exists once the job is done,
+        # so the status is fetched only when the download fails, to explain why
         logger.info(f"Calling _download_task for job_id: {job_id}, output_path: {output_path}")
-        download_result = appears_tools._download_task(job_id, output_path)
+        download_result = appears_tools._download_task(
+            job_id,
+            output_path,
+            task_status={"status": "done"},
+            max_workers=max_workers,
+        )
         logger.info(f"_download_task result: {download_result}")
 
         if download_result["status"] == "success":
@@ -216,6 +471,9 @@ def download_job_results(job_id: str, output_path: str = None) -> Dict[str, Any]
                 "files": download_result["files"],
             }
         else:
+            not_completed = _not_completed_error(job_id)
+            if not_completed is not None:
+                return not_completed
             logger.error(
                 f"download_job_results failed - job_id: {job_id}, error: {download_result['message']}"
             )
@@ -252,21 +510,7 @@ def list_bundle_files(job_id: str) -> Dict[str, Any]:
     """
     logger.info(f"list_bundle_files called with job_id: {job_id}")
     try:
-        # First check if job is completed
-        status_result = check_job_status(job_id)
-        if status_result["status"] != "success":
-            return {
-                "status": "error",
-                "message": f"Could not check job status: {status_result['message']}",
-            }
-
-        if status_result["job_status"] != "completed":
-            return {
-                "status": "error",
-                "message": f"Job {job_id} is not completed (current status: {status_result['job_status']})",
-            }
-
-        # Get the bundle files
+        # Get the bundle files; the job status is only checked if the bundle isn't there
         logger.info(f"Calling _list_bundle_files for job_id: {job_id}")
         bundle_result = appears_tools._list_bundle_files(job_id)
         logger.info(f"_list_bundle_files result: {bundle_result}")
@@ -282,6 +526,9 @@ def list_bundle_files(job_id: str) -> Dict[str, Any]:
                 "message": f"Found {len(files)} files in bundle for job {job_id}",
             }
         else:
+            not_completed = _not_completed_error(job_id)
+            if not_completed is not None:
+                return not_completed
             logger.error(
                 f"list_bundle_files failed - job_id: {job_id}, error: {bundle_result['message']}"
             )
@@ -307,6 +554,11 @@ def list_appears_jobs(limit: Optional[int] = None, offset: Optional[int] = None)
         Dictionary with list of jobs from AppEEARS API
     """
     logger.info(f"list_appears_jobs called with limit: {limit}, offset: {offset}")
+    key = (limit, offset)
+    with _status_cache_lock:
+        cached = _list_cache.get(key)
+    if cached is not None:
+        return cached
     try:
         # Build query parameters
         params = {}
@@ -315,56 +567,45 @@ def list_appears_jobs(limit: Optional[int] = None, offset: Optional[int] = None)
         if offset is not None:
             params["offset"] = offset
 
-        # Make request to AppEEARS API
-        response = appears_tools._make_request("GET", "task", params=params)
-        jobs = response.json()
-
-        # Process and format the jobs
-        formatted_jobs = []
-        for job in jobs:
-            # Map API status to our internal status
-            api_status = job.get("status", "unknown")
-            status_mapping = {
-                "pending": "pending",
-                "running": "running",
-                "done": "completed",
-                "failed": "failed",
-                "cancelled": "cancelled",
-            }
-            job_status = status_mapping.get(api_status.lower(), "pending")
-
-            formatted_job = {
-                "job_id": job.get("task_id"),
-                "task_name": job.get("task_name"),
-                "status": job_status,
-                "api_status": api_status,
-                "created": job.get("created"),
-                "updated": job.get("updated"),
-                "progress": job.get("progress"),
-                "message": job.get("message"),
-            }
-            formatted_jobs.append(formatted_job)
+        # Make request to AppEEARS API. Large listings are parsed one task at a time straight
+        # from the socket, so only the formatted jobs are ever held in memory
+        response = appears_tools._make_request("GET", "task", params=params, stream=True)
+        with response:
+            content_length = int(response.headers.get("Content-Length") or 0)
+            if 0 < content_length < _STREAM_LIST_BYTES:
+                jobs = _json(response)
+            else:
+                response.raw.decode_content = True
+                # Floats rather than Decimals, the same values json.loads gives small listings
+                jobs = ijson.items(response.raw, "item", use_float=True)
+
+            # Process and format the jobs
+            formatted_jobs = [_format_job(job) for job in jobs]
 
         logger.info(f"list_appears_jobs succeeded - found {len(formatted_jobs)} jobs")
-        return {
+        jobs_result = {
             "status": "success",
             "jobs": formatted_jobs,
             "total_jobs": len(formatted_jobs),
             "limit": limit,
             "offset": offset,
         }
+        with _status_cache_lock:
+            _list_cache[key] = jobs_result
+        return jobs_result
 
     except Exception as e:
         logger.error(f"Error listing AppEEARS jobs: {str(e)}")
         return {"status": "error", "message": f"Error listing jobs: {str(e)}"}
 
 
-def get_job_details(job_id: str) -> Dict[str, Any]:
+def get_job_details(job_id: str, include_full_response: bool = False) -> Dict[str, Any]:
     """
     Get detailed information about a specific AppEEARS job.
 
     Args:
         job_id: The job identifier
+        include_full_response: Also return the raw AppEEARS task status
 
     Returns:
         Dictionary with detailed job information
@@ -372,43 +613,22 @@ def get_job_details(job_id: str) -> Dict[str, Any]:
     logger.info(f"get_job_details called with job_id: {job_id}")
     try:
         # Get task status which includes detailed information
-        result = appears_tools._get_task_status(job_id)
-
-        if result["status"] == "success":
-            task_status = result["task_status"]
-
-            # Map API status to our internal status
-            api_status = task_status.get("status", "unknown")
-            status_mapping = {
-                "pending": "pending",
-                "running": "running",
-                "done": "completed",
-                "failed": "failed",
-                "cancelled": "cancelled",
-            }
-            job_status = status_mapping.get(api_status.lower(), "pending")
+        task = _fetch_task(job_id)
 
-            logger.info(f"get_job_details succeeded - job_id: {job_id}, status: {job_status}")
+        if task["status"] == "success":
+            logger.info(
+                f"get_job_details succeeded - job_id: {job_id}, status: {task['job_status']}"
+            )
             return {
-                "status": "success",
-                "job_id": job_id,
-                "job_status": job_status,
-                "api_status": api_status,
-                "task_name": task_status.get("task_name"),
-                "created": task_status.get("created"),
-                "updated": task_status.get("updated"),
-                "progress": task_status.get("progress"),
-                "message": task_status.get("message"),
-                "task_type": task_status.get("task_type"),
-                "parameters": task_status.get("params"),
-                "download_url": task_status.get("download_url"),
-                "full_response": task_status,
+                key: value
+                for key, value in task.items()
+                if not key.startswith("_") and (include_full_response or key != "full_response")
             }
         else:
-            logger.error(f"get_job_details failed - job_id: {job_id}, error: {result['message']}")
+            logger.error(f"get_job_details failed - job_id: {job_id}, error: {task['message']}")
             return {
                 "status": "error",
-                "message": f"Failed to get job details: {result['message']}",
+                "message": f"Failed to get job details: {task['message']}",
                 "job_id": job_id,
             }
 
@@ -432,24 +652,10 @@ def cancel_appears_job(job_id: str) -> Dict[str, Any]:
     """
     logger.info(f"cancel_appears_job called with job_id: {job_id}")
     try:
-        # First check if job exists and can be cancelled
-        status_result = check_job_status(job_id)
-        if status_result["status"] != "success":
-            return {
-                "status": "error",
-                "message": f"Could not check job status: {status_result['message']}",
-            }
-
-        job_status = status_result["job_status"]
-        if job_status in ["completed", "failed", "cancelled"]:
-            return {
-                "status": "error",
-                "message": f"Cannot cancel job {job_id} - it is already {job_status}",
-            }
-
-        # Try to cancel the job via API
+        # Cancel directly; the status is only fetched to explain a rejected request
         try:
             response = appears_tools._make_request("DELETE", f"task/{job_id}")
+            invalidate(job_id)
             logger.info(f"cancel_appears_job succeeded - job_id: {job_id}")
             return {
                 "status": "success",
@@ -467,14 +673,36 @@ def cancel_appears_job(job_id: str) -> Dict[str, Any]:
                     "message": "Job cancellation is not supported by the AppEEARS API",
                     "job_id": job_id,
                 }
-            else:
-                logger.error(f"cancel_appears_job failed - job_id: {job_id}, HTTP error: {str(e)}")
+
+            if e.response.status_code == 404:
                 return {
                     "status": "error",
-                    "message": f"Failed to cancel job: {str(e)}",
+                    "message": f"Job {job_id} not found",
                     "job_id": job_id,
                 }
 
+            if e.response.status_code in (400, 409):
+                # Usually the job already finished; only then is its status worth fetching
+                status_result = check_job_status(job_id)
+                if status_result["status"] != "success":
+                    return {
+                        "status": "error",
+                        "message": f"Could not check job status: {status_result['message']}",
+                    }
+                job_status = status_result["job_status"]
+                if job_status in _UNCANCELLABLE:
+                    return {
+                        "status": "error",
+                        "message": f"Cannot cancel job {job_id} - it is already {job_status}",
+                    }
+
+            logger.error(f"cancel_appears_job failed - job_id: {job_id}, HTTP error: {str(e)}")
+            return {
+                "status": "error",
+                "message": f"Failed to cancel job: {str(e)}",
+                "job_id": job_id,
+            }
+
     except Exception as e:
         logger.error(f"Error cancelling job: {str(e)}")
         return {"status": "error", "message": f"Error cancelling job: {str(e)}"}
@@ -492,31 +720,30 @@ def get_job_progress(job_id: str) -> Dict[str, Any]:
     """
     logger.info(f"get_job_progress called with job_id: {job_id}")
     try:
-        # Get job details which includes progress
-        details = get_job_details(job_id)
+        # Get the job status, which includes progress and elapsed time
+        task = _fetch_task(job_id)
 
-        if details["status"] != "success":
-            return details
+        if task["status"] != "success":
+            return {
+                "status": "error",
+                "message": f"Failed to get job details: {task['message']}",
+                "job_id": job_id,
+            }
 
         progress_info = {
             "status": "success",
             "job_id": job_id,
-            "job_status": details["job_status"],
-            "progress": details.get("progress"),
-            "message": details.get("message"),
-            "created": details.get("created"),
-            "updated": details.get("updated"),
+            "job_status": task["job_status"],
+            "progress": task["progress"],
+            "message": task["message"],
+            "created": task["created"],
+            "updated": task["updated"],
         }
 
-        # Calculate elapsed time if we have creation time
-        if details.get("created"):
-            try:
-                created_time = datetime.fromisoformat(details["created"].replace("Z", "+00:00"))
-                elapsed_time = (datetime.now(created_time.tzinfo) - created_time).total_seconds()
-                progress_info["elapsed_time_seconds"] = elapsed_time
-                progress_info["elapsed_time_formatted"] = f"{elapsed_time:.0f} seconds"
-            except:
-                pass
+        elapsed_time = _elapsed_time(task)
+        if elapsed_time is not None:
+            progress_info["elapsed_time_seconds"] = elapsed_time
+            progress_info["elapsed_time_formatted"] = f"{elapsed_time:.0f} seconds"
 
         logger.info(
             f"get_job_progress succeeded - job_id: {job_id}, status: {progress_info['job_status']}"
@@ -1,77 +1,207 @@
 """MCP server implementation using FastMCP."""
 
+import asyncio
+import atexit
+import functools
+import gc
+import hashlib
 import logging
 import os
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from types import ModuleType
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Union
+import orjson
 from dotenv import load_dotenv
 from fastmcp import FastMCP
-from space_apps_mcp.elastic_tools import ElasticTools
-from space_apps_mcp.appeears_tools import AppEEARSTools
-from space_apps_mcp.job_tools import (
-    submit_appears_job,
-    check_job_status,
-    download_job_results,
-    list_bundle_files,
-    list_appears_jobs,
-    get_job_details,
-    cancel_appears_job,
-    get_job_progress,
-)
+from typing_extensions import TypedDict
+
+if TYPE_CHECKING:
+    from space_apps_mcp.appeears_tools import AppEEARSTools
+    from space_apps_mcp.elastic_tools import ElasticTools
 
 load_dotenv()
 
 # Initialize FastMCP server
 mcp = FastMCP(
     name="SpaceAppsMCP",
+    # Tool results (search hits, task listings) can be large; orjson encodes them much
+    # faster than the stdlib encoder. Anything else falls back to str, like the default.
+    tool_serializer=lambda data: orjson.dumps(
+        data, default=str, option=orjson.OPT_NON_STR_KEYS
+    ).decode(),
 )
 
-# Initialize tools
-elastic_tools = ElasticTools()
-appears_tools = AppEEARSTools()
+
+# Argument schemas. FastMCP validates these in pydantic-core before the tool runs, so a
+# malformed layer, location or search is rejected before any request goes out.
+class LayerSpec(TypedDict):
+    layer: str
+    product: str
+
+
+class LocationSpec(TypedDict):
+    id: Union[str, int]
+    category: str
+    latitude: float
+    longitude: float
+
+
+class SearchSpec(TypedDict):
+    index: str
+    query: Dict[str, Any]
+
+
+# Tools are created on first use, so a session that only uses Elasticsearch never loads the
+# AppEEARS client and vice versa
+@functools.lru_cache(maxsize=None)
+def _elastic() -> "ElasticTools":
+    from space_apps_mcp.elastic_tools import ElasticTools
+
+    return ElasticTools()
+
+
+@functools.lru_cache(maxsize=None)
+def _appears() -> "AppEEARSTools":
+    from space_apps_mcp.appeears_tools import AppEEARSTools
+
+    return AppEEARSTools.instance()
+
+
+def _jobs() -> ModuleType:
+    from space_apps_mcp import job_tools
+
+    return job_tools
+
+
+# Blocking Elastic and AppEEARS calls run on this pool so the event loop stays free for other
+# tool calls. The wait tools hold a worker for the whole wait, hence the generous default.
+_EXEC = ThreadPoolExecutor(
+    max_workers=int(os.getenv("MCP_IO_WORKERS", "32")), thread_name_prefix="mcp-io"
+)
+atexit.register(_EXEC.shutdown, wait=True)
+
+
+async def _run(fn, *args, **kwargs):
+    """Run a blocking tool implementation on the shared I/O pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_EXEC, functools.partial(fn, *args, **kwargs))
+
+
+class _SingleFlight:
+    """Share one in-flight call between concurrent callers passing identical arguments."""
+
+    def __init__(self):
+        # Only touched from the event loop thread, so no lock is needed
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def do(self, fn, *args, **kwargs):
+        key = hashlib.blake2b(
+            orjson.dumps(
+                (fn.__qualname__, args, kwargs),
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+            )
+        ).hexdigest()
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(_run(fn, *args, **kwargs))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # A caller that gives up must not cancel the call the others are waiting on
+        return await asyncio.shield(future)
+
+
+# Read-only tools go through this, so N identical concurrent calls cost one backend request
+_single_flight = _SingleFlight()
 
 
 # Register Elastic tools
 @mcp.tool()
-def list_elastic_indices() -> Dict[str, Any]:
+async def list_elastic_indices() -> Dict[str, Any]:
     """List all available Elasticsearch indices."""
-    return elastic_tools._list_indices()
+    return await _single_flight.do(_elastic()._list_indices)
 
 
 @mcp.tool()
-def search_elastic_index(index: str, query: Dict[str, Any]) -> Dict[str, Any]:
-    """Search an Elasticsearch index with a query."""
-    return elastic_tools._search_index(index, query)
+async def search_elastic_index(
+    index: str,
+    query: Dict[str, Any],
+    includes: Optional[List[str]] = None,
+    size: int = 10,
+    profile: bool = False,
+) -> Dict[str, Any]:
+    """
+    Search an Elasticsearch index with a query.
+
+    Args:
+        index: The index to search
+        query: The search body
+        includes: Only return these fields of each document (optional)
+        size: Number of hits to return when the query doesn't set one (default: 10, max: 1000)
+        profile: Also return a per-phase timing summary and whether the query can be cached
+    """
+    return await _single_flight.do(_elastic()._search_index, index, query, includes, size, profile)
 
 
 @mcp.tool()
-def ingest_elastic_document(index: str, document: Dict[str, Any]) -> Dict[str, Any]:
-    """Ingest a single document into Elasticsearch."""
-    return elastic_tools._ingest_document(index, document)
+async def msearch_elastic(searches: List[SearchSpec]) -> Dict[str, Any]:
+    """
+    Run several Elasticsearch searches in a single request.
+
+    Args:
+        searches: List of searches, each with an 'index' and a 'query' search body
+
+    Returns:
+        Dictionary with one response per search, in the same order
+    """
+    return await _single_flight.do(_elastic()._msearch, searches)
+
+
+@mcp.tool()
+async def ingest_elastic_document(index: str, document: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Ingest a single document into Elasticsearch.
+
+    Documents are queued and sent together in bulk requests shortly afterwards; call
+    flush_elastic_ingest before searching for documents that were just ingested.
+    """
+    return await _run(_elastic()._queue_document, index, document)
+
+
+@mcp.tool()
+async def flush_elastic_ingest() -> Dict[str, Any]:
+    """
+    Send all documents queued by ingest_elastic_document to Elasticsearch now and refresh the
+    indices they went to, so they are searchable once this returns.
+
+    Also reports background sends that failed since the last flush; documents from a request
+    that failed outright were queued again and are included in this flush.
+    """
+    return await _run(_elastic()._flush_ingest)
 
 
 @mcp.tool()
-def bulk_ingest_elastic(index: str, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+async def bulk_ingest_elastic(index: str, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Bulk ingest multiple documents into Elasticsearch."""
-    return elastic_tools._bulk_ingest(index, documents)
+    return await _run(_elastic()._bulk_ingest, index, documents)
 
 
 # Register AppEEARS tools
 @mcp.tool()
-def list_appears_products() -> Dict[str, Any]:
+async def list_appears_products() -> Dict[str, Any]:
     """List all available AppEEARS products."""
-    return appears_tools._list_products()
+    return await _single_flight.do(_appears()._list_products)
 
 
 @mcp.tool()
-def get_appears_layers(product_and_version: str) -> Dict[str, Any]:
+async def get_appears_layers(product_and_version: str) -> Dict[str, Any]:
     """List available layers for a given AppEEARS product."""
-    return appears_tools._get_layers(product_and_version)
+    return await _single_flight.do(_appears()._get_layers, product_and_version)
 
 
 @mcp.tool()
-def submit_appears_point_request(
-    layers: List[Dict[str, str]],
-    locations: List[Dict[str, Any]],
+async def submit_appears_point_request(
+    layers: List[LayerSpec],
+    locations: List[LocationSpec],
     start_date: str,
     end_date: str,
     task_name: str = "LlamaAgentTask",
@@ -86,35 +216,114 @@ def submit_appears_point_request(
         end_date (str): End date for the request
         task_name (str): Name of the task to submit
     """
-    return appears_tools._submit_point_request(layers, locations, start_date, end_date, task_name)
+    return await _run(
+        _appears()._submit_point_request, layers, locations, start_date, end_date, task_name
+    )
 
 
 @mcp.tool()
-def get_appears_task_status(task_id: str) -> Dict[str, Any]:
+async def submit_appears_point_requests(
+    layers: List[LayerSpec],
+    locations: List[LocationSpec],
+    start_date: str,
+    end_date: str,
+    task_name: str = "LlamaAgentTask",
+    locations_per_task: int = 100,
+) -> Dict[str, Any]:
+    """
+    Submit a point request with many locations as several NASA AppEEARS tasks.
+
+    Use this instead of submit_appears_point_request when there are hundreds of locations;
+    poll the returned tasks with get_appears_task_statuses.
+
+    Args:
+        layers: List of layers to request, each with keys layer and product
+        locations: List of locations, each with keys id, category, latitude and longitude
+        start_date: Start date for the request (YYYY-MM-DD)
+        end_date: End date for the request (YYYY-MM-DD)
+        task_name: Base name of the tasks
+        locations_per_task: Maximum number of locations in a single task (default: 100)
+
+    Returns:
+        Dictionary with the submitted task IDs
+    """
+    return await _run(
+        _appears()._submit_point_requests,
+        layers,
+        locations,
+        start_date,
+        end_date,
+        task_name,
+        locations_per_task,
+    )
+
+
+@mcp.tool()
+async def get_appears_task_status(task_id: str) -> Dict[str, Any]:
     """Get the status of a NASA AppEEARS task."""
-    return appears_tools._get_task_status(task_id)
+    return await _single_flight.do(_appears()._get_task_status, task_id)
+
+
+@mcp.tool()
+async def get_appears_task_statuses(task_ids: List[str]) -> Dict[str, Any]:
+    """
+    Get the status of several NASA AppEEARS tasks at once.
+
+    Args:
+        task_ids: The IDs of the tasks to check
+
+    Returns:
+        Dictionary with the status of each task keyed by task ID
+    """
+    return await _single_flight.do(_appears()._get_task_statuses, task_ids)
 
 
 @mcp.tool()
-def download_appears_task(task_id: str, output_path: str) -> Dict[str, Any]:
+async def wait_for_appears_task(
+    task_id: str, timeout: float = 3600, poll_interval: float = 1.0
+) -> Dict[str, Any]:
+    """
+    Wait for a NASA AppEEARS task to finish instead of polling its status repeatedly.
+
+    Args:
+        task_id: The ID of the task to wait for
+        timeout: Maximum number of seconds to wait (default: 3600)
+        poll_interval: Seconds before the first re-check; later checks back off up to a minute
+                       apart (default: 1)
+
+    Returns:
+        Dictionary with the final task status and the seconds waited, or an error if the
+        wait timed out
+    """
+    return await _run(_appears()._wait_for_task, task_id, timeout, poll_interval)
+
+
+@mcp.tool()
+async def download_appears_task(
+    task_id: str, output_path: str, max_workers: Optional[int] = None
+) -> Dict[str, Any]:
     """
     Download results from a completed NASA AppEEARS task.
 
+    Files are streamed straight to disk, several at a time.
+
     Args:
         task_id: The ID of the task to download
         output_path: The path to save the downloaded results
+        max_workers: Number of files downloaded at once
+                     (default: APPEEARS_DOWNLOAD_CONCURRENCY or 8)
 
     Returns:
         Dictionary with download status and information
     """
-    return appears_tools._download_task(task_id, output_path)
+    return await _run(_appears()._download_task, task_id, output_path, max_workers=max_workers)
 
 
 # Register Job Management tools
 @mcp.tool()
-def submit_appears_job_tool(
-    layers: List[Dict[str, str]],
-    locations: List[Dict[str, Any]],
+async def submit_appears_job_tool(
+    layers: List[LayerSpec],
+    locations: List[LocationSpec],
     start_date: str,
     end_date: str,
     task_name: str = "AgentTask",
@@ -141,11 +350,13 @@ def submit_appears_job_tool(
     Returns:
         Dictionary with job_id and status information for tracking
     """
-    return submit_appears_job(layers, locations, start_date, end_date, task_name)
+    return await _run(
+        _jobs().submit_appears_job, layers, locations, start_date, end_date, task_name
+    )
 
 
 @mcp.tool()
-def check_job_status_tool(job_id: str) -> Dict[str, Any]:
+async def check_job_status_tool(job_id: str) -> Dict[str, Any]:
     """
     Check the status of an AppEEARS job.
 
@@ -163,11 +374,32 @@ def check_job_status_tool(job_id: str) -> Dict[str, Any]:
     Returns:
         Dictionary with current job status and information
     """
-    return check_job_status(job_id)
+    return await _single_flight.do(_jobs().check_job_status, job_id)
+
+
+@mcp.tool()
+async def wait_for_job_tool(
+    job_id: str, max_wait: float = 3600, poll_budget: int = 30
+) -> Dict[str, Any]:
+    """
+    Wait for an AppEEARS job to finish instead of calling check_job_status_tool in a loop.
+
+    Polls are spaced out according to how long recent jobs took, so a long job costs only a
+    few dozen status requests.
+
+    Args:
+        job_id: The job identifier returned from submit_appears_job_tool
+        max_wait: Maximum number of seconds to wait (default: 3600)
+        poll_budget: Number of status checks spread over the expected job duration (default: 30)
+
+    Returns:
+        Dictionary with the final job status, or an error if the wait timed out
+    """
+    return await _run(_jobs().wait_for_job, job_id, max_wait, poll_budget)
 
 
 @mcp.tool()
-def download_job_results_tool(job_id: str, output_path: str = None) -> Dict[str, Any]:
+async def download_job_results_tool(job_id: str, output_path: str = None) -> Dict[str, Any]:
     """
     Download all results for a completed AppEEARS job using the Bundle API.
 
@@ -190,11 +422,11 @@ def download_job_results_tool(job_id: str, output_path: str = None) -> Dict[str,
     Returns:
         Dictionary with download status and folder information including all downloaded files
     """
-    return download_job_results(job_id, output_path)
+    return await _run(_jobs().download_job_results, job_id, output_path)
 
 
 @mcp.tool()
-def list_bundle_files_tool(job_id: str) -> Dict[str, Any]:
+async def list_bundle_files_tool(job_id: str) -> Dict[str, Any]:
     """
     List files available in a bundle for a completed AppEEARS job.
 
@@ -215,11 +447,11 @@ def list_bundle_files_tool(job_id: str) -> Dict[str, Any]:
     Returns:
         Dictionary with list of files in the bundle including file IDs and names
     """
-    return list_bundle_files(job_id)
+    return await _single_flight.do(_jobs().list_bundle_files, job_id)
 
 
 @mcp.tool()
-def list_appears_jobs_tool(limit: int = None, offset: int = None) -> Dict[str, Any]:
+async def list_appears_jobs_tool(limit: int = None, offset: int = None) -> Dict[str, Any]:
     """
     List all AppEEARS jobs using the API.
 
@@ -233,11 +465,11 @@ def list_appears_jobs_tool(limit: int = None, offset: int = None) -> Dict[str, A
     Returns:
         Dictionary with list of jobs from AppEEARS API
     """
-    return list_appears_jobs(limit, offset)
+    return await _single_flight.do(_jobs().list_appears_jobs, limit, offset)
 
 
 @mcp.tool()
-def get_job_details_tool(job_id: str) -> Dict[str, Any]:
+async def get_job_details_tool(job_id: str, include_full_response: bool = False) -> Dict[str, Any]:
     """
     Get detailed information about a specific AppEEARS job.
 
@@ -245,15 +477,16 @@ def get_job_details_tool(job_id: str) -> Dict[str, Any]:
 
     Args:
         job_id: The job identifier returned from submit_appears_job_tool
+        include_full_response: Also return the raw AppEEARS task status (default: False)
 
     Returns:
         Dictionary with detailed job information
     """
-    return get_job_details(job_id)
+    return await _single_flight.do(_jobs().get_job_details, job_id, include_full_response)
 
 
 @mcp.tool()
-def cancel_appears_job_tool(job_id: str) -> Dict[str, Any]:
+async def cancel_appears_job_tool(job_id: str) -> Dict[str, Any]:
     """
     Cancel an AppEEARS job.
 
@@ -266,11 +499,11 @@ def cancel_appears_job_tool(job_id: str) -> Dict[str, Any]:
     Returns:
         Dictionary with cancellation status
     """
-    return cancel_appears_job(job_id)
+    return await _run(_jobs().cancel_appears_job, job_id)
 
 
 @mcp.tool()
-def get_job_progress_tool(job_id: str) -> Dict[str, Any]:
+async def get_job_progress_tool(job_id: str) -> Dict[str, Any]:
     """
     Get detailed progress information for a running job.
 
@@ -282,7 +515,14 @@ def get_job_progress_tool(job_id: str) -> Dict[str, Any]:
     Returns:
         Dictionary with progress information
     """
-    return get_job_progress(job_id)
+    return await _single_flight.do(_jobs().get_job_progress, job_id)
+
+
+# Everything imported and registered so far lives as long as the server; keeping it out of the
+# cyclic GC's scans makes the collections that large tool calls (bulk ingests, big searches)
+# set off much cheaper, without turning the collector off for other threads. This runs at
+# import, so it also applies under `fastmcp run`, which never executes the block below.
+gc.freeze()
 
 
 if __name__ == "__main__":